@@ -0,0 +1,137 @@
+"""
+Micro-benchmark of table extraction from policja.pl and timeanddate.com pages.
+
+Compares the previous BeautifulSoup + pd.read_html path with extract_table.
+Pages stored in the response cache (project/data/cache/http) are used when
+available, otherwise pages with the same table markup are generated.
+
+Run from the repository root:
+    python -m benchmarks.html_tables
+"""
+
+import json
+import os
+import timeit
+from io import StringIO
+from typing import Optional
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from project.data_processing.downloaders import (HOLIDAYS_TABLE_CLASS,
+                                                 POLICE_TABLE_CLASS)
+from project.data_processing.html_tables import extract_table
+from project.data_processing.http_cache import HTTP_CACHE_DIR
+
+REPEATS = 20
+
+
+def read_html_table(html: str, class_name: str) -> Optional[pd.DataFrame]:
+    """Previous extraction path: parse with BeautifulSoup, re-parse the table with read_html."""
+    soup = BeautifulSoup(html, "html.parser")
+    table = soup.find("table", class_=class_name)
+    if table:
+        return pd.read_html(StringIO(str(table)))[0]
+    return None
+
+
+def cached_pages(host: str) -> list[str]:
+    """Returns bodies of cached responses downloaded from the host."""
+    entries_dir = os.path.join(HTTP_CACHE_DIR, "entries")
+    if not os.path.isdir(entries_dir):
+        return []
+    pages = []
+    for name in os.listdir(entries_dir):
+        with open(os.path.join(entries_dir, name), "r", encoding="utf-8") as file:
+            entry = json.load(file)
+        if host not in entry["url"]:
+            continue
+        blob = os.path.join(HTTP_CACHE_DIR, "blobs", entry["body"][:2], entry["body"])
+        with open(blob, "rb") as file:
+            pages.append(file.read().decode(entry["encoding"] or "utf-8", "replace"))
+    return pages
+
+
+def filler() -> str:
+    """Markup surrounding the table on a real page."""
+    return "".join(
+        f'<div class="news"><a href="/pol/{i}">Link {i}</a><p>{"tekst " * 40}</p></div>'
+        for i in range(150)
+    )
+
+
+def generated_police_page() -> str:
+    """Listing page with 20 days, like policja.pl."""
+    header = "".join(
+        f"<th>{name}</th>"
+        for name in [
+            "Data",
+            "Interwencje",
+            "Zatrzymani na gorącym uczynku",
+            "Zatrzymani poszukiwani",
+            "Kierujący po spożyciu alkoholu",
+            "Wypadki drogowe",
+            "Zabici w wypadkach",
+            "Ranni w wypadkach",
+        ]
+    )
+    rows = "".join(
+        f"<tr><td>2023-12-{31 - day:02d}</td><td>{15000 + day}</td><td>{500 + day}</td>"
+        f"<td>{250 + day}</td><td>{150 + day}</td><td>{60 + day}</td><td>{day % 9}</td>"
+        f"<td>{70 + day}</td></tr>"
+        for day in range(20)
+    )
+    return (
+        f'<html><body>{filler()}<table class="{POLICE_TABLE_CLASS}">'
+        f"<thead><tr>{header}</tr></thead><tbody>{rows}</tbody></table>{filler()}</body></html>"
+    )
+
+
+def generated_holidays_page() -> str:
+    """Holidays page with 40 entries, like timeanddate.com."""
+    rows = "".join(
+        f"<tr><th>{day % 28 + 1} sty</th><td>poniedziałek</td><td><a>Holiday {day}</a></td>"
+        f"<td>{'National holiday' if day % 3 == 0 else 'Observance'}</td></tr>"
+        for day in range(40)
+    )
+    return (
+        f'<html><body>{filler()}<table class="{HOLIDAYS_TABLE_CLASS}">'
+        "<thead><tr><th>Date</th><th></th><th>Name</th><th>Type</th></tr></thead>"
+        f"<tbody>{rows}</tbody></table>{filler()}</body></html>"
+    )
+
+
+def benchmark(name: str, pages: list[str], class_name: str) -> None:
+    """Prints the mean time per page of both extraction paths."""
+    for page in pages:
+        old = read_html_table(page, class_name)
+        new = extract_table(page, class_name)
+        if old is not None and new is not None and old.shape != new.shape:
+            print(f"{name}: shape mismatch {old.shape} != {new.shape}")
+
+    old_time = timeit.timeit(
+        lambda: [read_html_table(page, class_name) for page in pages], number=REPEATS
+    )
+    new_time = timeit.timeit(
+        lambda: [extract_table(page, class_name) for page in pages], number=REPEATS
+    )
+    per_page = REPEATS * len(pages)
+    print(
+        f"{name} ({len(pages)} pages): "
+        f"bs4+read_html {old_time / per_page * 1000:.2f} ms/page, "
+        f"extract_table {new_time / per_page * 1000:.2f} ms/page, "
+        f"speedup {old_time / new_time:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    benchmark(
+        "policja.pl",
+        cached_pages("policja.pl") or [generated_police_page()],
+        POLICE_TABLE_CLASS,
+    )
+    benchmark(
+        "timeanddate.com",
+        cached_pages("timeanddate.com") or [generated_holidays_page()],
+        HOLIDAYS_TABLE_CLASS,
+    )
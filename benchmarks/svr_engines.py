@@ -0,0 +1,65 @@
+"""
+Benchmark of the SVR engines as the number of training rows grows.
+
+Compares the exact kernel SVR with Nystroem and random Fourier features
+followed by a linear SVR (make_svr). Rows are drawn from the feature matrix
+(project/data/features, built by `python -m project`) with small noise added
+to the continuous features, to simulate more stations or more years. The days
+are split into disjoint train and test days first, so no test row is a noisy
+copy of a training row.
+
+Run from the repository root:
+    python -m benchmarks.svr_engines
+"""
+
+import time
+
+import numpy as np
+from sklearn.metrics import r2_score
+
+from project.data_processing.features import FeatureMatrix
+from project.data_processing.models import make_scaler, make_svr
+from project.setup import MODEL_PARAMS, SVR_FEATURES
+
+ROWS = [1_000, 2_000, 5_000, 10_000, 20_000, 50_000]
+# exact SVR is skipped above this number of rows, it takes minutes
+EXACT_MAX_ROWS = 20_000
+TEST_ROWS = 2_000
+# share of the days of the feature matrix kept for the test rows
+TEST_FRACTION = 0.2
+ENGINES = ["exact", "nystroem", "rff"]
+
+
+def sample_rows(
+    X: np.ndarray, y: np.ndarray, count: int, rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray]:
+    """Draws rows with replacement and adds noise to the scaled continuous features."""
+    rows = rng.integers(0, len(X), count)
+    X_sample = X[rows].copy()
+    X_sample[:, :3] += rng.normal(0, 0.05, (count, 3))
+    return X_sample, y[rows] + rng.normal(0, 1, count)
+
+
+if __name__ == "__main__":
+    features = FeatureMatrix()
+    frame = features.frame(SVR_FEATURES)
+    y = np.asarray(features.column("Wypadki drogowe"))
+    rng = np.random.default_rng(0)
+    order = rng.permutation(len(frame))
+    test_days = order[: int(len(frame) * TEST_FRACTION)]
+    train_days = order[len(test_days) :]
+    X = make_scaler().fit(frame.iloc[train_days]).transform(frame)
+    X_test, y_test = sample_rows(X[test_days], y[test_days], TEST_ROWS, rng)
+
+    print(f"{'rows':>7} {'engine':>9} {'fit s':>8} {'R2':>6}")
+    for count in ROWS:
+        X_train, y_train = sample_rows(X[train_days], y[train_days], count, rng)
+        for engine in ENGINES:
+            if engine == "exact" and count > EXACT_MAX_ROWS:
+                continue
+            svr = make_svr({**MODEL_PARAMS["svr"], "engine": engine})
+            start = time.perf_counter()
+            svr.fit(X_train, y_train)
+            seconds = time.perf_counter() - start
+            score = r2_score(y_test, svr.predict(X_test))
+            print(f"{count:>7} {engine:>9} {seconds:>8.3f} {score:>6.3f}")
@@ -1,13 +1,15 @@
 import logging
 from argparse import ArgumentParser, BooleanOptionalAction, Namespace
 
-from project.data_processing.dataframes import read_csv_file
-from project.data_processing.downloaders import download_data
-from project.data_processing.models import prepare_model_rfr, prepare_model_svr
-from project.setup import PREDICT_RFR, PREDICT_SVR
+import pandas as pd
+
+from project.data_processing.downloaders import check_holidays_data
+from project.data_processing.http_cache import set_offline
+from project.data_processing.storage import SCHEMAS, export_csv
+from project.pipeline import STAGES, Pipeline
+from project.setup import (END_YEAR, SERVER_PORT, START_YEAR, SVR_FEATURES,
+                           TARGETS)
 from project.setup_logging import setup_logging
-from project.visualization.stats import print_stats
-from project.visualization.visualization import visualize_data
 
 logger = logging.getLogger()
 
@@ -29,41 +31,171 @@ def parse_args() -> Namespace:
         default=False,
         help="Print statsistics",
     )
+    parser.add_argument(
+        "-U",
+        "--update",
+        action=BooleanOptionalAction,
+        default=False,
+        help="Download police data published since the last run and update the online SVR without tuning and training",
+    )
+    parser.add_argument(
+        "--offline",
+        action=BooleanOptionalAction,
+        default=False,
+        help="Serve downloads only from the local response cache",
+    )
+    parser.add_argument(
+        "--check-holidays",
+        action=BooleanOptionalAction,
+        default=False,
+        help="Compare calculated holidays with timeanddate.com",
+    )
+    parser.add_argument(
+        "--export-csv",
+        action=BooleanOptionalAction,
+        default=False,
+        help="Export all datasets to CSV files in project/data",
+    )
+    parser.add_argument(
+        "-P",
+        "--predict",
+        nargs="+",
+        type=float,
+        default=None,
+        metavar="VALUE",
+        help="Predict with the active saved model from feature values in the order of PREDICT_SVR or PREDICT_RFR",
+    )
+    parser.add_argument(
+        "--predict-file",
+        default=None,
+        metavar="PATH",
+        help="Predict every row of a CSV or Parquet file with feature columns named like in PREDICT_SVR or PREDICT_RFR",
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        metavar="PATH",
+        help="CSV or Parquet file for --predict-file and --backtest results, stdout by default",
+    )
+    parser.add_argument(
+        "--model",
+        choices=["svr", "rfr", "online"],
+        default="svr",
+        help="Saved model used by --predict and --predict-file, model of --backtest",
+    )
+    parser.add_argument(
+        "--retrain-online",
+        action=BooleanOptionalAction,
+        default=False,
+        help="Fit the online SVR again on the full history instead of adding new days",
+    )
+    parser.add_argument(
+        "--backtest",
+        action=BooleanOptionalAction,
+        default=False,
+        help="Evaluate the model with a walk-forward backtest on the feature matrix",
+    )
+    parser.add_argument(
+        "--serve",
+        action=BooleanOptionalAction,
+        default=False,
+        help="Serve predictions of the saved models over HTTP on localhost",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=SERVER_PORT,
+        help="Port of the prediction server",
+    )
+    parser.add_argument(
+        "--from",
+        dest="start",
+        choices=STAGES,
+        default=None,
+        help="Run this pipeline stage and all stages after it even if nothing changed",
+    )
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=STAGES,
+        default=None,
+        help="Run only these pipeline stages",
+    )
     return parser.parse_args()
 
 
+def run_predictions(args: Namespace) -> None:
+    """Predict with the active saved model for --predict and --predict-file"""
+    # imported here, the models are needed only for predictions
+    from project.data_processing.batch_predict import predict_file
+    from project.data_processing.models import predict_saved
+    from project.data_processing.online import predict_online
+
+    try:
+        if args.predict:
+            predicted = (
+                predict_online(pd.DataFrame([args.predict], columns=SVR_FEATURES))[
+                    TARGETS
+                ]
+                if args.model == "online"
+                else predict_saved(args.model, [args.predict])
+            )
+            for target in predicted.columns:
+                logger.info(
+                    f"{args.model} prediction for {target}: {predicted[target].iloc[0]}"
+                )
+        if args.predict_file:
+            predict_file(args.model, args.predict_file, args.output)
+    except (FileNotFoundError, ValueError) as error:
+        raise SystemExit(str(error)) from error
+
+
+def run_backtest(args: Namespace) -> None:
+    """Run a walk-forward backtest of --model for --backtest"""
+    # imported here, the models are needed only for the backtest
+    from project.data_processing.backtest import backtest
+    from project.data_processing.batch_predict import write_predictions
+    from project.data_processing.features import FeatureMatrix
+
+    if args.model == "online":
+        raise SystemExit("The svr backtest already updates the online SVR day by day")
+    try:
+        results = backtest(args.model, FeatureMatrix())
+    except (FileNotFoundError, ValueError) as error:
+        raise SystemExit(str(error)) from error
+    write_predictions(results, args.output)
+
+
 if __name__ == "__main__":
 
     args = parse_args()
     setup_logging()
+    set_offline(args.offline)
 
-    download_data(2018, 2023)
-
-    police_data = read_csv_file("police_data.csv")
-    weather_data = read_csv_file("weather_data.csv")
-    holidays_data = read_csv_file("holidays_data.csv")
-    weekends_data = read_csv_file("weekends_data.csv")
-
-    if args.visualization:
-        visualize_data(police_data, weather_data)
-    if args.statsistics:
-        print_stats(police_data, weather_data, holidays_data, weekends_data)
-
-    prepare_model_svr(
-        police_data,
-        weather_data,
-        holidays_data,
-        weekends_data,
-        2018,
-        2023,
-        PREDICT_SVR,
-    )
-    prepare_model_rfr(
-        police_data,
-        weather_data,
-        holidays_data,
-        weekends_data,
-        2018,
-        2023,
-        PREDICT_RFR,
-    )
+    if args.serve:
+        # imported here, the models are needed only for predictions
+        from project.server import run_server
+
+        run_server(port=args.port)
+        raise SystemExit(0)
+
+    if args.predict or args.predict_file:
+        run_predictions(args)
+        raise SystemExit(0)
+
+    if args.backtest:
+        run_backtest(args)
+        raise SystemExit(0)
+
+    if args.check_holidays:
+        check_holidays_data(START_YEAR, END_YEAR)
+    if args.export_csv:
+        for dataset in SCHEMAS:
+            export_csv(dataset)
+
+    Pipeline(
+        update=args.update,
+        statistics=args.statsistics,
+        visualization=args.visualization,
+        retrain_online=args.retrain_online,
+    ).run(start=args.start, only=args.only)
@@ -0,0 +1,99 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Dict
+
+logger = logging.getLogger()
+
+ARCHIVES_DIR = os.path.join("project", "data", "archives")
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Calculates the SHA-256 of a file without loading it into memory.
+
+    Args:
+        path (str): Path to the file.
+        chunk_size (int): Number of bytes read at once.
+
+    Returns:
+        str: Hex digest of the file.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArchiveManifest:
+    """
+    Size and checksum of every completely downloaded archive.
+
+    Archives are first written to a `.part` file and recorded here only after
+    they were fully downloaded, so an archive that matches its entry never has
+    to be downloaded again.
+
+    Attributes:
+        directory (str): Directory with the archives and the manifest.
+    """
+
+    def __init__(self, directory: str = ARCHIVES_DIR) -> None:
+        """
+        Initializes an ArchiveManifest object and loads the manifest if it exists.
+
+        Args:
+            directory (str): Directory with the archives and the manifest.
+        """
+        self.directory = directory
+        self._path = os.path.join(directory, "manifest.json")
+        self._entries: Dict[str, Dict[str, str | int]] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(self._path):
+            try:
+                with open(self._path, "r", encoding="utf-8") as file:
+                    self._entries = json.load(file)
+            except (OSError, ValueError):
+                logger.warning(
+                    "Archive manifest %s is corrupted, ignoring it", self._path
+                )
+
+    def is_complete(self, name: str) -> bool:
+        """
+        Checks whether the archive exists and matches its recorded size and checksum.
+
+        Args:
+            name (str): File name of the archive.
+
+        Returns:
+            bool: True if the archive does not have to be downloaded again.
+        """
+        path = os.path.join(self.directory, name)
+        with self._lock:
+            entry = self._entries.get(name)
+        if entry is None or not os.path.exists(path):
+            return False
+        if os.path.getsize(path) != entry["size"]:
+            return False
+        return file_sha256(path) == entry["sha256"]
+
+    def record(self, name: str) -> None:
+        """
+        Records the size and checksum of a completely downloaded archive.
+
+        Args:
+            name (str): File name of the archive.
+        """
+        path = os.path.join(self.directory, name)
+        entry: Dict[str, str | int] = {
+            "size": os.path.getsize(path),
+            "sha256": file_sha256(path),
+        }
+        with self._lock:
+            self._entries[name] = entry
+            tmp_path = f"{self._path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(self._entries, file, indent=1, sort_keys=True)
+            os.replace(tmp_path, self._path)
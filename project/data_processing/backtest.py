@@ -0,0 +1,191 @@
+import logging
+import time
+from typing import Any, Dict, Protocol
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error, r2_score
+
+from project.data_processing.features import FeatureMatrix
+from project.data_processing.model_params import model_params
+from project.data_processing.models import MODELS, make_rfr
+from project.data_processing.online import IncrementalSVR
+from project.setup import (BACKTEST_INITIAL_DAYS, BACKTEST_RECENT_DAYS,
+                           BACKTEST_STEP_DAYS, BACKTEST_TREES_PER_STEP,
+                           TARGETS)
+
+logger = logging.getLogger()
+
+
+class IncrementalModel(Protocol):
+    """Model refitted at every origin of the backtest."""
+
+    def update(self, X: np.ndarray, y: np.ndarray, start: int) -> None:
+        """Updates the model with rows X[start:], X holds all rows before the origin."""
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Predicts all targets of the rows."""
+
+
+class WarmStartForest:
+    """
+    Random forest renewed with warm_start instead of being refitted.
+
+    The first update fits n_estimators trees. Every later update drops the
+    trees_per_step oldest trees and, with warm_start, fits only as many new
+    trees on the last recent_days rows (one row per day), so a window costs
+    a few small trees and the forest follows changes in the data instead of
+    being dominated by trees of the first years.
+
+    Attributes:
+        forest (RandomForestRegressor): The multi-output forest.
+    """
+
+    def __init__(
+        self,
+        params: Dict[str, Any],
+        trees_per_step: int = BACKTEST_TREES_PER_STEP,
+        recent_days: int = BACKTEST_RECENT_DAYS,
+    ) -> None:
+        self.trees_per_step = trees_per_step
+        self.recent_days = recent_days
+        self.forest = make_rfr({**params, "warm_start": True})
+
+    def update(self, X: np.ndarray, y: np.ndarray, start: int) -> None:
+        """
+        Fits the forest on the first update and renews its oldest trees later.
+
+        Args:
+            X (np.ndarray): Features of all rows before the origin.
+            y (np.ndarray): Targets of all rows before the origin.
+            start (int): First row not seen by the model, 0 on the first update.
+        """
+        if start == 0:
+            self.forest.fit(X, y)
+            return
+        del self.forest.estimators_[: self.trees_per_step]
+        self.forest.n_estimators = len(self.forest.estimators_) + self.trees_per_step
+        self.forest.fit(X[-self.recent_days :], y[-self.recent_days :])
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predicts all targets of the rows.
+
+        Args:
+            X (np.ndarray): Features of the rows.
+
+        Returns:
+            np.ndarray: Predicted targets, one column per target.
+        """
+        return self.forest.predict(X)  # type: ignore[no-any-return]
+
+
+def make_incremental(name: str, params: Dict[str, Any]) -> IncrementalModel:
+    """Returns the incremental counterpart of the model."""
+    if name == "svr":
+        return IncrementalSVR(params, MODELS[name][1])
+    return WarmStartForest(params)
+
+
+def walk_forward_windows(
+    dates: np.ndarray,
+    initial_days: int = BACKTEST_INITIAL_DAYS,
+    step_days: int = BACKTEST_STEP_DAYS,
+) -> list[tuple[int, int]]:
+    """
+    Splits date-sorted rows into rolling-origin windows.
+
+    Args:
+        dates (np.ndarray): Sorted date of every row.
+        initial_days (int): Days before the first origin.
+        step_days (int): Days between origins, predicted by every window.
+
+    Returns:
+        list[tuple[int, int]]: Origin and end row of every window, the model
+            is trained on rows before the origin and tested on rows origin:end.
+            Only windows of step_days days are returned.
+    """
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    origin_date = dates[0] + np.timedelta64(initial_days, "D")
+    end_date = origin_date + np.timedelta64(step_days, "D")
+    windows = []
+    # a shorter last window would give a noisy R2, it is left out
+    while end_date <= dates[-1] + np.timedelta64(1, "D"):
+        windows.append(
+            (
+                int(np.searchsorted(dates, origin_date)),
+                int(np.searchsorted(dates, end_date)),
+            )
+        )
+        origin_date, end_date = end_date, end_date + np.timedelta64(step_days, "D")
+    return windows
+
+
+def backtest(
+    name: str,
+    features: FeatureMatrix,
+    initial_days: int = BACKTEST_INITIAL_DAYS,
+    step_days: int = BACKTEST_STEP_DAYS,
+) -> pd.DataFrame:
+    """
+    Evaluates the model with a walk-forward (rolling-origin) backtest.
+
+    Unlike the random split of train_svr and train_rfr, every window is
+    predicted by a model that saw only the days before it. The model is
+    not refitted from scratch at every origin: it is updated with the days
+    added since the previous origin (see IncrementalSVR and WarmStartForest),
+    so the whole backtest costs about as much as one fit instead of one fit
+    per window.
+
+    Args:
+        name (str): Name of the model, a key of MODELS.
+        features (FeatureMatrix): Date-sorted data.
+        initial_days (int): Days of the first training window.
+        step_days (int): Days predicted by every window.
+
+    Returns:
+        pd.DataFrame: Dates, rows, fit time and MAE and R2 of every target
+            for every window.
+
+    Raises:
+        ValueError: If the data does not cover the first training window.
+    """
+    windows = walk_forward_windows(features.dates, initial_days, step_days)
+    if not windows:
+        raise ValueError(f"Backtest needs more than {initial_days} days of data")
+    X = np.asarray(features.frame(MODELS[name][1]))
+    y = np.asarray(features.frame(TARGETS))
+    model = make_incremental(name, model_params(name))
+
+    results = []
+    previous = 0
+    for origin, end in windows:
+        start = time.perf_counter()
+        model.update(X[:origin], y[:origin], previous)
+        fit_seconds = time.perf_counter() - start
+        predicted = model.predict(X[origin:end])
+        result = {
+            "start": features.dates[origin],
+            "end": features.dates[end - 1],
+            "train_rows": origin,
+            "test_rows": end - origin,
+            "fit_seconds": fit_seconds,
+        }
+        for i, target in enumerate(TARGETS):
+            result[f"{target} mae"] = mean_absolute_error(
+                y[origin:end, i], predicted[:, i]
+            )
+            result[f"{target} r2"] = r2_score(y[origin:end, i], predicted[:, i])
+        results.append(result)
+        previous = origin
+
+    frame = pd.DataFrame(results)
+    logger.info(
+        f"Backtested {name} on {len(windows)} windows in {frame['fit_seconds'].sum():.2f} s"
+    )
+    for target in TARGETS:
+        logger.info(
+            f"{name} walk-forward {target}: MAE {frame[f'{target} mae'].mean():.3f}, "
+            f"R2 {frame[f'{target} r2'].mean():.3f}"
+        )
+    return frame
@@ -0,0 +1,76 @@
+import logging
+import os
+import sys
+import time
+from typing import Optional
+
+import pandas as pd
+
+from project.data_processing.models import predict_batch
+from project.data_processing.online import predict_online
+
+logger = logging.getLogger()
+
+
+def read_feature_rows(path: str) -> pd.DataFrame:
+    """
+    Reads feature rows from a CSV or Parquet file.
+
+    Args:
+        path (str): Path to a `.csv` or `.parquet` file.
+
+    Returns:
+        pd.DataFrame: The rows.
+
+    Raises:
+        ValueError: If the file has another extension.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return pd.read_csv(path, sep=",")
+    if extension == ".parquet":
+        return pd.read_parquet(path)
+    raise ValueError(f"Unsupported feature file {path}, expected .csv or .parquet")
+
+
+def write_predictions(predicted: pd.DataFrame, path: Optional[str] = None) -> None:
+    """
+    Writes predictions to a CSV or Parquet file, or as CSV to stdout.
+
+    Args:
+        predicted (pd.DataFrame): Features with the predicted targets.
+        path (Optional[str]): Path to a `.csv` or `.parquet` file, stdout by default.
+    """
+    if path is None:
+        predicted.to_csv(sys.stdout, index=False)
+    elif path.lower().endswith(".parquet"):
+        predicted.to_parquet(path, index=False)
+    else:
+        predicted.to_csv(path, index=False)
+
+
+def predict_file(
+    name: str, input_path: str, output_path: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Predicts all targets for every row of a feature file with the latest saved model.
+
+    Args:
+        name (str): Name of the model, "svr", "rfr" or "online".
+        input_path (str): Feature rows, `.csv` or `.parquet`.
+        output_path (Optional[str]): Output file, stdout by default.
+
+    Returns:
+        pd.DataFrame: Features with the predicted targets.
+    """
+    rows = read_feature_rows(input_path)
+    start = time.perf_counter()
+    predicted = predict_online(rows) if name == "online" else predict_batch(name, rows)
+    logger.info(
+        "Predicted %s rows with %s in %.3f s",
+        len(predicted),
+        name,
+        time.perf_counter() - start,
+    )
+    write_predictions(predicted, output_path)
+    return predicted
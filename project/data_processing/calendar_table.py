@@ -0,0 +1,58 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from project.data_processing.holidays import create_holidays_dataframe
+
+# Friday, Saturday and Sunday, like in weekends_data.csv
+WEEKEND_DAYS = (4, 5, 6)
+
+
+def create_calendar_table(
+    start_year: int, end_year: int, holidays: Optional[pd.DataFrame] = None
+) -> pd.DataFrame:
+    """
+    Create a day-indexed table with calendar features for the given years.
+
+    All columns are computed in one vectorized pass over the days:
+        -Weekends: Friday, Saturday or Sunday
+        -Holidays: national holiday
+        -Bridge: working day between two days off (Saturday, Sunday or holiday)
+        -Day of week: 0 is Monday
+        -Month
+        -Day of year
+
+    Args:
+        start_year (int): The start year.
+        end_year (int): The end year.
+        holidays (Optional[pd.DataFrame]): Holidays with a Date column,
+            calculated with create_holidays_dataframe by default.
+
+    Returns:
+        pd.DataFrame: Calendar features indexed by date.
+    """
+    if start_year > end_year:
+        start_year, end_year = end_year, start_year
+    if holidays is None:
+        holidays = create_holidays_dataframe(start_year, end_year)
+
+    days = pd.date_range(start=f"{start_year}-01-01", end=f"{end_year}-12-31", freq="D")
+    day_of_week = days.dayofweek.to_numpy()
+    is_holiday = days.isin(pd.to_datetime(holidays["Date"]))
+
+    day_off = is_holiday | (day_of_week >= 5)
+    previous_off = np.concatenate(([False], day_off[:-1]))
+    next_off = np.concatenate((day_off[1:], [False]))
+
+    return pd.DataFrame(
+        {
+            "Weekends": np.isin(day_of_week, WEEKEND_DAYS),
+            "Holidays": is_holiday,
+            "Bridge": ~day_off & previous_off & next_off,
+            "Day of week": day_of_week.astype(np.int8),
+            "Month": days.month.to_numpy().astype(np.int8),
+            "Day of year": days.dayofyear.to_numpy().astype(np.int16),
+        },
+        index=pd.Index(days, name="Date"),
+    )
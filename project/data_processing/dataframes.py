@@ -1,136 +1,114 @@
 import os
+from typing import Optional
 
 import pandas as pd
 
+from project.data_processing.calendar_table import create_calendar_table
+from project.data_processing.storage import (apply_schema, load_dataset,
+                                             reading_dtypes)
+from project.data_processing.weather_store import WeatherStore
 
-def read_csv_file(file_name: str) -> pd.DataFrame:
+
+def fill_missing(name: str, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Fill missing police counts with column means and cast columns to the dataset schema.
+
+    Args:
+        name (str): Name of the dataset.
+        df (pd.DataFrame): The dataset.
+
+    Returns:
+        pd.DataFrame: The dataset with compact, typed columns.
+    """
+    if name == "police_data":
+        df = df.fillna(df.mean(numeric_only=True))
+    return apply_schema(name, df)
+
+
+def read_csv_file(file_name: str, columns: Optional[list[str]] = None) -> pd.DataFrame:
     """
     Read the data from the 'data' directory.
 
-    This function reads the data from the 'data' directory.
+    Columns are parsed with the compact dtypes declared in the dataset schema.
+
+    Args:
+        file_name (str): Name of the CSV file, e.g. "police_data.csv".
+        columns (Optional[list[str]]): Columns to load, all by default.
 
     Returns:
         pd.DataFrame: DataFrame containing the data.
     """
-
+    name = file_name.removesuffix(".csv")
     df = pd.read_csv(
-        os.path.join("project", "data", file_name), encoding="unicode_escape", sep=","
+        os.path.join("project", "data", file_name),
+        sep=",",
+        usecols=columns,
+        dtype=reading_dtypes(name),
     )
-    if "Data" in df.columns:
-        df["Data"] = pd.to_datetime(df["Data"])
-    else:
-        df["Date"] = pd.to_datetime(df["Date"])
-    if file_name.endswith("police_data.csv"):
-        df.fillna(df.mean(), inplace=True)
-    return df
+    return fill_missing(name, df)
 
 
-def create_weather_dataframe() -> pd.DataFrame:
+def read_dataset(name: str, columns: Optional[list[str]] = None) -> pd.DataFrame:
     """
-    Create a weather dataframe containing data for the PSZCZYNA station.
+    Read the dataset from the 'data' directory.
+
+    The dataset is loaded with the default storage backend, with the compact
+    dtypes declared in its schema.
+
+    Args:
+        name (str): Name of the dataset, e.g. "police_data".
+        columns (Optional[list[str]]): Columns to load, all by default.
 
     Returns:
-        pd.DataFrame: A dataframe containing weather data for the PSZCZYNA station.
+        pd.DataFrame: DataFrame containing the data.
     """
-    dataframes = []
-    columns = [
-        "Station Code",
-        "Station Name",
-        "Year",
-        "Month",
-        "Day",
-        "Max Temp",
-        "T MAX Status",
-        "Min Temp",
-        "T MIN Status",
-        "Avg Temp",
-        "STD Status",
-        "Ground Temp",
-        "TMNG Status",
-        "Precip Sum",
-        "SMBD Status",
-        "Precip Type",
-        "Snow",
-        "PKSN Status",
-    ]  # based on k_d_format.txt
-
-    # create a list of dataframes
-    for file in os.listdir(os.path.join(os.getcwd(), "project", "data")):
-        if file.endswith(".csv") and "k_d_" in file:
-            dataframes.append(
-                pd.read_csv(
-                    os.path.join(os.getcwd(), "project", "data", file),
-                    encoding="unicode_escape",
-                    sep=",",
-                    header=None,
-                    names=columns,
-                )
-            )
-
-    # filter dataframes to only contain data for PSZCZYNA
-    correct_station = []
-    for dataframe in dataframes:
-        correct_station.append(dataframe[dataframe["Station Name"] == "PSZCZYNA"])
-
-    # remove unnecessary columns
-    columns = ["Year", "Month", "Day", "Avg Temp", "Precip Sum", "Precip Type"]
-
-    correct_station = [i.loc[:, columns] for i in correct_station]
-    for i in correct_station:
-        i["Date"] = pd.to_datetime(i[["Year", "Month", "Day"]])
-        i.drop(columns=["Year", "Month", "Day"], inplace=True)
-
-    # change order of columns
-    correct_station = [
-        i[["Date", "Avg Temp", "Precip Sum", "Precip Type"]] for i in correct_station
-    ]
+    return fill_missing(name, load_dataset(name, columns))
+
 
-    data = pd.concat(correct_station)
-    data = data.sort_values(by="Date").reset_index(drop=True)
-    data["Precip Type"] = data["Precip Type"].fillna("-")
+def create_weather_dataframe(
+    start_year: int,
+    end_year: int,
+    station: str = "PSZCZYNA",
+    archives: Optional[list[str]] = None,
+) -> pd.DataFrame:
+    """
+    Create a weather dataframe containing data for the given station and years.
+
+    The data is read from the station-partitioned weather store. Archives passed
+    here are ingested into the store first. The store keeps every ingested
+    year, so the rows are limited to the requested years.
+
+    Args:
+        start_year (int): The start year.
+        end_year (int): The end year.
+        station (str): Name or code of the station. Defaults to "PSZCZYNA".
+        archives (Optional[list[str]]): Paths to IMGW zip archives to ingest.
 
-    return data
+    Returns:
+        pd.DataFrame: A dataframe containing weather data for the station.
+    """
+    store = WeatherStore()
+    if archives:
+        store.ingest(archives)
+    weather = store.read(station)
+    years = weather["Date"].dt.year
+    return weather[(years >= start_year) & (years <= end_year)].reset_index(drop=True)
 
 
 def create_weekends_dataframe(start_year: int, end_year: int) -> pd.DataFrame:
     """
-    Create a dataframe containing all the weekends (Friday, Saturdays and Sundays) for a given year.
+    Create a dataframe containing all the weekends (Friday, Saturdays and Sundays) for given years.
 
     Args:
-        year (int): The year for which the weekends dataframe is to be created. Defaults to 2023.
+        start_year (int): The start year.
+        end_year (int): The end year.
 
     Returns:
-        pd.DataFrame: A dataframe containing the dates of all the weekends in the specified year.
+        pd.DataFrame: A dataframe containing the dates of all the weekends in the specified years.
     """
-    data = []
-    for year in range(start_year, end_year + 1):
-        weekends = pd.DataFrame(
-            {
-                "Date": pd.date_range(
-                    start=f"{year}-01-01", end=f"{year}-12-31", freq="W-FRI"
-                )
-            }
-        )
-        saturdays = pd.DataFrame(
-            {
-                "Date": pd.date_range(
-                    start=f"{year}-01-01", end=f"{year}-12-31", freq="W-SAT"
-                )
-            }
-        )
-        sundays = pd.DataFrame(
-            {
-                "Date": pd.date_range(
-                    start=f"{year}-01-01", end=f"{year}-12-31", freq="W-SUN"
-                )
-            }
-        )
-        weekends = pd.concat([weekends, saturdays, sundays]).reset_index(drop=True)
-        weekends["Date"] = weekends["Date"].dt.strftime("%Y-%m-%d")
-        weekends = weekends.sort_values(by="Date").reset_index(drop=True)
-        data.append(weekends)
-
-    return pd.concat(data, ignore_index=True)
+    calendar = create_calendar_table(start_year, end_year)
+    weekends = calendar.index[calendar["Weekends"].to_numpy()]
+    return pd.DataFrame({"Date": weekends.strftime("%Y-%m-%d")})
 
 
 def fix_police_data(police_data: pd.DataFrame) -> pd.DataFrame:
@@ -1,54 +1,116 @@
 import logging
 import os
-import time
+import re
 from abc import ABC, abstractmethod
-from datetime import datetime
-from io import StringIO
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 from time import sleep
-from typing import Optional, Tuple
+from typing import Callable, Dict, Optional, Sequence, Tuple
 
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup
 
+from project.data_processing.archives import ARCHIVES_DIR, ArchiveManifest
 from project.data_processing.dataframes import (create_weather_dataframe,
                                                 create_weekends_dataframe,
                                                 fix_holidays_data)
-from project.data_processing.move_data import (delete_useless_files,
-                                               move_zip_files, unzip_files)
+from project.data_processing.holidays import create_holidays_dataframe
+from project.data_processing.html_tables import extract_table
+from project.data_processing.http_cache import cached_get, is_offline
+from project.data_processing.page_index import PageIndex
+from project.data_processing.rate_limiter import TokenBucket
 from project.data_processing.save_data import (save_holidays_data_to_file,
                                                save_police_data_to_file,
                                                save_weather_data_to_file,
                                                save_weekends_data_to_file)
+from project.data_processing.storage import (apply_schema, dataset_exists,
+                                             load_dataset)
+from project.data_processing.task_graph import Task, TaskResult, run_task_graph
+from project.data_processing.transport import http_client
+from project.setup import (POLICE_BURST, POLICE_MAX_IN_FLIGHT,
+                           POLICE_REQUESTS_PER_SECOND, WEATHER_CHUNK_SIZE,
+                           WEATHER_MAX_IN_FLIGHT, WEATHER_STATION)
 from project.setup_logging import setup_logging
 
 logger = logging.getLogger()
 setup_logging()
 
+POLICE_TABLE_CLASS = "table-listing table-striped margin_b20"
+HOLIDAYS_TABLE_CLASS = "table table--left table--inner-borders-rows table--full-width table--sticky table--holidaycountry"
 
-def download_data(start_year: int, end_year: int) -> None:
+
+def download_data(
+    start_year: int, end_year: int, update: bool = False, refresh: Sequence[str] = ()
+) -> Dict[str, TaskResult]:
     """
     Downloads data for the specified years.
 
+    Sources hit different hosts and share no data, so the missing ones are
+    downloaded concurrently. A failing source does not discard the others.
+
     Args:
         start_year (int): The start year.
         end_year (int): The end year.
+        update (bool): Whether to fetch the newest police data into an existing
+            file and extend the weather data to its last day.
+        refresh (Sequence[str]): Datasets downloaded again even if they exist,
+            e.g. after the settings they were downloaded with changed.
 
     Returns:
-        None
+        Dict[str, TaskResult]: Result of every downloaded source.
     """
     if start_year > end_year:
         start_year, end_year = end_year, start_year
 
-    if not os.path.exists(os.path.join("project", "data", "police_data.csv")):
-        save_police_data_to_file(download_police_data(start_year, end_year))
+    def missing(name: str) -> bool:
+        return name in refresh or not dataset_exists(name)
+
+    tasks = []
+    if missing("police_data"):
+        tasks.append(
+            Task(
+                "police",
+                lambda: save_police_data_to_file(
+                    download_police_data(start_year, end_year)
+                ),
+            )
+        )
+    elif update:
+        tasks.append(Task("police", update_police_data))
+
+    if missing("weather_data"):
+        tasks.append(
+            Task(
+                "weather",
+                lambda: save_weather_data_to_file(
+                    download_weather_data(start_year, end_year)
+                ),
+            )
+        )
+    elif update:
+        # the weather follows the police data, it is extended after the police update
+        police = [task.name for task in tasks if task.name == "police"]
+        tasks.append(Task("weather", update_weather_data, depends_on=police))
+    if missing("holidays_data"):
+        tasks.append(
+            Task(
+                "holidays",
+                lambda: save_holidays_data_to_file(
+                    create_holidays_dataframe(start_year, end_year)
+                ),
+            )
+        )
+    if missing("weekends_data"):
+        tasks.append(
+            Task(
+                "weekends",
+                lambda: save_weekends_data_to_file(
+                    create_weekends_dataframe(start_year, end_year)
+                ),
+            )
+        )
 
-    if not os.path.exists(os.path.join("project", "data", "weather_data.csv")):
-        save_weather_data_to_file(download_weather_data(start_year, end_year))
-    if not os.path.exists(os.path.join("project", "data", "holidays_data.csv")):
-        save_holidays_data_to_file(download_holidays_data(start_year, end_year))
-    if not os.path.exists(os.path.join("project", "data", "weekends_data.csv")):
-        save_weekends_data_to_file(create_weekends_dataframe(start_year, end_year))
+    return run_task_graph(tasks)
 
 
 def download_police_data(start_year: int, end_year: int) -> pd.DataFrame:
@@ -61,21 +123,87 @@ def download_police_data(start_year: int, end_year: int) -> pd.DataFrame:
 
     Returns:
         pd.DataFrame: The downloaded data.
+
+    Raises:
+        RuntimeError: If the data of a year could not be downloaded.
     """
-    logger.info(
-        "Attention, this download method is very slow and probably will take forever!"
-    )
     if start_year > end_year:
         start_year, end_year = end_year, start_year
 
     data = []
+    p = PoliceDataDownloader()
     for year in range(start_year, end_year + 1):
-        p = PoliceDataDownloader()
         p.download(year)
+        if p.data is None:
+            raise RuntimeError(f"Failed to download police data for {year}")
         data.append(p.get_data())
+        logger.info("Police data for %s: %s days", year, len(data[-1]))
     return pd.concat(data, ignore_index=True)
 
 
+def update_police_data() -> None:
+    """
+    Appends police data published since the last stored day to the police dataset.
+
+    Returns:
+        None
+
+    Raises:
+        RuntimeError: If the new data could not be downloaded.
+    """
+    stored = load_dataset("police_data")
+    last_known = stored["Data"].max().date()
+
+    p = PoliceDataDownloader()
+    p.download_since(last_known)
+    if p.data is None:
+        raise RuntimeError("Failed to update police data")
+    if len(p.data) == 0:
+        logger.info("Police data is up to date")
+        return
+
+    merged = pd.concat(
+        [stored, apply_schema("police_data", p.get_data())], ignore_index=True
+    )
+    merged = merged.drop_duplicates(subset="Data", keep="last")
+    save_police_data_to_file(merged.sort_values(by="Data").reset_index(drop=True))
+
+
+def update_weather_data() -> None:
+    """
+    Extends the weather dataset to the last stored day of police data.
+
+    Only the monthly archives after the last stored weather day are downloaded
+    and ingested into the weather store, the earlier days are read from it.
+    Nothing is saved unless all archives are downloaded, so a later update
+    starts again from the same day instead of leaving a hole.
+
+    Returns:
+        None
+
+    Raises:
+        RuntimeError: If an archive could not be downloaded.
+    """
+    weather_dates = load_dataset("weather_data", columns=["Date"])["Date"]
+    last_weather = weather_dates.max().date()
+    last_police = load_dataset("police_data", columns=["Data"])["Data"].max().date()
+    if last_weather >= last_police:
+        logger.info("Weather data is up to date")
+        return
+
+    months = pd.period_range(last_weather + timedelta(days=1), last_police, freq="M")
+    archives = download_weather_months([(month.year, month.month) for month in months])
+    if len(archives) < len(months):
+        raise RuntimeError(
+            f"Failed to update weather data, {len(months) - len(archives)} "
+            f"of {len(months)} archives are missing"
+        )
+    weather_data = create_weather_dataframe(
+        weather_dates.min().year, last_police.year, WEATHER_STATION, archives
+    )
+    save_weather_data_to_file(weather_data)
+
+
 def download_holidays_data(start_year: int, end_year: int) -> pd.DataFrame:
     """
     Downloads holidays data for the specified year.
@@ -98,29 +226,48 @@ def download_holidays_data(start_year: int, end_year: int) -> pd.DataFrame:
     return pd.concat(data, ignore_index=True)
 
 
-def download_weather_data(start_year: int, end_year: int) -> pd.DataFrame:
+def check_holidays_data(start_year: int, end_year: int) -> bool:
     """
-    Downloads weather data for the specified years.
+    Cross-checks the calculated holidays against timeanddate.com.
 
     Args:
         start_year (int): The start year.
         end_year (int): The end year.
 
     Returns:
-        None
+        bool: True if both sources list the same holiday dates.
     """
-    if start_year > end_year:
-        start_year, end_year = end_year, start_year
+    calculated = set(create_holidays_dataframe(start_year, end_year)["Date"])
+    downloaded = set(
+        pd.to_datetime(download_holidays_data(start_year, end_year)["Date"])
+    )
+
+    for day in sorted(calculated - downloaded):
+        logger.warning("Holiday %s is missing on timeanddate.com", day.date())
+    for day in sorted(downloaded - calculated):
+        logger.warning("Holiday %s from timeanddate.com is not calculated", day.date())
+    if calculated == downloaded:
+        logger.info("Calculated holidays match timeanddate.com")
+    return calculated == downloaded
 
-    for year in range(start_year, end_year + 1):
-        w = WeatherDataDownloader(year)
-        w.download()
 
-    move_zip_files()
-    unzip_files()
-    delete_useless_files()
+def download_weather_data(start_year: int, end_year: int) -> pd.DataFrame:
+    """
+    Downloads weather data for the specified years.
+
+    Args:
+        start_year (int): The start year.
+        end_year (int): The end year.
 
-    return create_weather_dataframe()
+    Returns:
+        pd.DataFrame: The downloaded data.
+    """
+    return create_weather_dataframe(
+        start_year,
+        end_year,
+        WEATHER_STATION,
+        download_weather_archives(start_year, end_year),
+    )
 
 
 class Downloader(ABC):  # pylint: disable=too-few-public-methods
@@ -149,12 +296,20 @@ class Downloader(ABC):  # pylint: disable=too-few-public-methods
         """
 
 
+class PageDownloadError(RuntimeError):
+    """A listing page could not be downloaded."""
+
+
 class PoliceDataDownloader(Downloader):
     """
     Class for downloading specific data from Polish Police website
 
     Args:
         url (str): URL to the website with data
+        max_in_flight (int): Maximum number of pages downloaded at the same time
+        rate_limiter (Optional[TokenBucket]): Limiter shared by all requests,
+            by default allows POLICE_REQUESTS_PER_SECOND requests per second
+        page_index (Optional[PageIndex]): On-disk index of page bounds
 
     Methods:
         download(accidents_year: int = 2023) -> None:
@@ -166,11 +321,23 @@ class PoliceDataDownloader(Downloader):
     """
 
     def __init__(
-        self, url: str = "https://policja.pl/pol/form/1,Informacja-dzienna.html?page=0"
+        self,
+        url: str = "https://policja.pl/pol/form/1,Informacja-dzienna.html?page=0",
+        max_in_flight: int = POLICE_MAX_IN_FLIGHT,
+        rate_limiter: Optional[TokenBucket] = None,
+        page_index: Optional[PageIndex] = None,
     ) -> None:
         super().__init__(url)
+        if max_in_flight < 1:
+            raise ValueError("At least one page must be allowed in flight")
         self.recived_data: list[pd.DataFrame] = []
         self.data: pd.DataFrame = None
+        self.max_in_flight = max_in_flight
+        self.rate_limiter = rate_limiter or TokenBucket(
+            POLICE_REQUESTS_PER_SECOND, POLICE_BURST
+        )
+        self.page_index = page_index or PageIndex()
+        self._pages: Dict[int, pd.DataFrame] = {}
 
     def get_data(self) -> pd.DataFrame:
         """
@@ -191,6 +358,8 @@ class PoliceDataDownloader(Downloader):
         """
         Downloads data from the website and stores it in a pandas DataFrame
 
+        data stays None if the download failed.
+
         Args:
             accidents_year (int): The year for which to download the data
 
@@ -200,22 +369,84 @@ class PoliceDataDownloader(Downloader):
         if accidents_year > datetime.now().year:
             raise ValueError("Year cannot be greater than current year!")
 
-        first_page = self._find_first_page(accidents_year)
+        self.recived_data = []
+        self.data = None
+        if not self._validate_page_index():
+            logger.error("Failed to download first page!")
+            return
 
-        if first_page is None:
-            logger.error("Failed to find page with given year!")
+        try:
+            first_page = self._find_first_page(accidents_year)
+            last_page = (
+                None
+                if first_page is None
+                else self._find_last_page(accidents_year, first_page[0])
+            )
+        except PageDownloadError as error:
+            logger.error("Failed to find page with given year! %s", error)
             return
-        last_page = self._find_last_page(accidents_year, first_page[0])
-        if last_page is None:
+        if first_page is None or last_page is None:
             logger.error("Failed to find page with given year!")
             return
 
+        self.page_index.save()
+
         if self._download_specific_pages(first_page, last_page):
             self._concat_data()
             logger.info("Data downloaded successfully!")
         else:
             logger.error("Failed to download data!")
 
+    def download_since(self, last_known: date) -> None:
+        """
+        Downloads only the entries newer than the given date.
+
+        Listing pages are fetched from the newest one until a page reaches a date
+        that is already known, so a daily refresh costs a single request or two.
+
+        Args:
+            last_known (date): Date of the newest entry that is already stored
+        """
+        self.recived_data = []
+        self.data = None
+        if not self._validate_page_index():
+            logger.error("Failed to download first page!")
+            return
+
+        page = 0
+        while True:
+            data = self._get_page(page)
+            if data is None or len(data) == 0:
+                logger.error("Failed to download page %s!", page)
+                self.recived_data.clear()
+                return
+            dates = pd.to_datetime(data["Data"]).dt.date
+            self.recived_data.append(data[dates > last_known])
+            if dates.iloc[-1] <= last_known:
+                break
+            page += 1
+
+        self.page_index.save()
+        self._concat_data()
+        logger.info(
+            "Downloaded %s new entries", sum(len(data) for data in self.recived_data)
+        )
+
+    def _validate_page_index(self) -> bool:
+        """
+        Checks the page index against a freshly downloaded page 0.
+
+        Returns:
+            bool: False if page 0 could not be downloaded
+        """
+        data = self._get_page(0)
+        if data is None or len(data) == 0:
+            return False
+        self.page_index.validate(
+            [datetime.strptime(day, "%Y-%m-%d").date() for day in data["Data"]]
+        )
+        return True
+
     def _get_raw_url(self) -> str:
         url = self.url.split("=")
         if len(url) > 1:
@@ -223,15 +454,15 @@ class PoliceDataDownloader(Downloader):
         return "=".join(url[:-1]) + "="
 
     def _download_data(self, unique_url: str) -> Optional[pd.DataFrame]:
-        sleep(0.7)
-        response = requests.get(unique_url, timeout=5)  # Add timeout argument
+        self.rate_limiter.acquire()
+        try:
+            response = cached_get(unique_url, timeout=5)
+        except requests.RequestException as error:
+            logger.error("Failed to download data from url: %s\n%s", unique_url, error)
+            return None
         if response.status_code == 200:
             logger.debug("Successfully downloaded data")
-            soup = BeautifulSoup(response.text, "html.parser")
-            table = soup.find("table", class_="table-listing table-striped margin_b20")
-            if table:
-                return pd.read_html(StringIO(str(table)))[0]
-            return None
+            return extract_table(response.text, POLICE_TABLE_CLASS)
         logging.error(
             "Failed to download data, error code %s \nfrom url: %s",
             response.status_code,
@@ -239,105 +470,188 @@ class PoliceDataDownloader(Downloader):
         )
         return None
 
-    def _find_first_page(self, accidents_year: int) -> Optional[Tuple[int, int]]:
-        """_summary_
+    def _get_page(self, page: int) -> Optional[pd.DataFrame]:
+        """
+        Returns the listing page, downloading it only once per downloader.
+
+        Failed downloads are not remembered, so calling download again after an
+        error fetches only the pages that are still missing.
 
         Args:
-            accidents_year (int): _description_
+            page (int): Page number.
 
         Returns:
-            Optional[Tuple[int, int]]: _description_
+            Optional[pd.DataFrame]: The page table, or None if the download failed.
+        """
+        if page in self._pages:
+            return self._pages[page]
+        data = self._download_data(self._get_raw_url() + f"{page}")
+        if data is not None:
+            self._pages[page] = data
+        return data
+
+    def _page_bounds(self, page: int) -> Optional[Tuple[date, date]]:
         """
-        url = self._get_raw_url()
-        data = self._download_data(url + "0")
+        Returns the dates of the first and the last row on the page.
 
-        if data is None or len(data) == 0:
+        Bounds are read from the page index when possible and stored there otherwise.
+
+        Args:
+            page (int): Page number.
+
+        Returns:
+            Optional[Tuple[date, date]]: First and last date, or None if the page is empty.
+
+        Raises:
+            PageDownloadError: If the page could not be downloaded.
+        """
+        bounds = self.page_index.get(page)
+        if bounds is not None:
+            return bounds
+        data = self._get_page(page)
+        if data is None:
+            raise PageDownloadError(f"Failed to download page {page}")
+        if len(data) == 0:
             return None
+        bounds = self._read_bounds(data)
+        self.page_index.put(page, *bounds, len(data))
+        return bounds
+
+    @staticmethod
+    def _read_bounds(data: pd.DataFrame) -> Tuple[date, date]:
+        """
+        Returns the dates of the first and the last row of a listing page.
+        """
+        return (
+            datetime.strptime(data.loc[0, "Data"], "%Y-%m-%d").date(),
+            datetime.strptime(data.loc[len(data) - 1, "Data"], "%Y-%m-%d").date(),
+        )
 
-        first_year = datetime.strptime(data.loc[0, "Data"], "%Y-%m-%d").year
-        last_year = datetime.strptime(data.loc[len(data) - 1, "Data"], "%Y-%m-%d").year
-        page_iterator = 0
+    def _search_pages(
+        self, predicate: Callable[[Tuple[date, date]], bool], low: int = 0
+    ) -> int:
+        """
+        Finds the first page, starting from low, whose bounds satisfy the predicate.
 
-        while first_year > accidents_year and last_year > accidents_year:
-            page_iterator += 1
-            data = self._download_data(url + f"{page_iterator}")
-            if data is None or len(data) == 0:
-                return None
-            first_year = datetime.strptime(data.loc[0, "Data"], "%Y-%m-%d").year
-            last_year = datetime.strptime(
-                data.loc[len(data) - 1, "Data"], "%Y-%m-%d"
-            ).year
+        Pages are sorted by date, so the predicate is expected to be false for some
+        prefix of pages and true afterwards. Empty pages are past the end of the
+        listing; a page that cannot be downloaded stops the search, otherwise a
+        transient error would cut the year short. The boundary is bracketed with
+        exponentially growing steps and then bisected.
 
-        for index, row in data.iterrows():
+        Args:
+            predicate (Callable[[Tuple[date, date]], bool]): Monotone page predicate.
+            low (int): First page to check.
+
+        Returns:
+            int: Number of the first page satisfying the predicate.
+
+        Raises:
+            PageDownloadError: If a page could not be downloaded.
+        """
+
+        def holds(page: int) -> bool:
+            bounds = self._page_bounds(page)
+            return bounds is None or predicate(bounds)
+
+        if holds(low):
+            return low
+        step = 1
+        high = low + step
+        while not holds(high):
+            low = high
+            step *= 2
+            high = low + step
+
+        while high - low > 1:
+            middle = (low + high) // 2
+            if holds(middle):
+                high = middle
+            else:
+                low = middle
+        return high
+
+    def _find_first_page(self, accidents_year: int) -> Optional[Tuple[int, int]]:
+        """
+        Finds the page and the row with the newest entry from the given year.
+
+        Args:
+            accidents_year (int): The year to look for.
 
+        Returns:
+            Optional[Tuple[int, int]]: Page number and row index, or None if not found.
+        """
+        page = self._search_pages(lambda bounds: bounds[1].year <= accidents_year)
+        data = self._get_page(page)
+        if data is None or len(data) == 0:
+            return None
+
+        for index, row in data.iterrows():
             if datetime.strptime(row["Data"], "%Y-%m-%d").year == accidents_year:
-                return (page_iterator, index)
+                return (page, index)
         return None
 
     def _find_last_page(
         self, accidents_year: int, first_page: int
     ) -> Optional[Tuple[int, int]]:
-        """_summary_
+        """
+        Finds the page and the row with the oldest entry from the given year.
 
         Args:
-            accidents_year (int): _description_
+            accidents_year (int): The year to look for.
+            first_page (int): Page with the newest entry from the given year.
 
         Returns:
-            Optional[Tuple[int, int]]: _description_
+            Optional[Tuple[int, int]]: Page number and row index, or None if not found.
         """
-        url = self._get_raw_url()
-        data = self._download_data(url + f"{first_page}")
-        if data is None or len(data) == 0:
-            return None
-        first_year = datetime.strptime(data.loc[0, "Data"], "%Y-%m-%d").year
-        last_year = datetime.strptime(data.loc[len(data) - 1, "Data"], "%Y-%m-%d").year
-        page_iterator = first_page
-
-        while first_year >= accidents_year or last_year >= accidents_year:
-            page_iterator += 1
-            data = self._download_data(url + f"{page_iterator}")
-            if data is None or len(data) == 0:
-                return None
-            first_year = datetime.strptime(data.loc[0, "Data"], "%Y-%m-%d").year
-            last_year = datetime.strptime(
-                data.loc[len(data) - 1, "Data"], "%Y-%m-%d"
-            ).year
-
-        if first_year < accidents_year or last_year < accidents_year:
-            page_iterator -= 1
-        data = self._download_data(url + f"{page_iterator}")
+        page = (
+            self._search_pages(
+                lambda bounds: bounds[0].year < accidents_year, first_page
+            )
+            - 1
+        )
+        data = self._get_page(page)
         if data is None or len(data) == 0:
             return None
         for index, row in data.iloc[::-1].iterrows():
             if datetime.strptime(row["Data"], "%Y-%m-%d").year == accidents_year:
-                return (page_iterator, index)
+                return (page, index)
         return None
 
     def _download_specific_pages(
         self, first_page: Tuple[int, int], last_page: Tuple[int, int]
     ) -> bool:
-        url = self._get_raw_url()
-        data = self._download_data(url + f"{first_page[0]}")
+        """
+        Downloads all pages between first_page and last_page (both inclusive).
 
-        if data is None or len(data) == 0:
-            self.recived_data.clear()
-            return False
+        Pages are fetched concurrently, at most max_in_flight at a time, and are
+        stored in recived_data in page order.
 
-        self.recived_data.append(data.loc[first_page[1] :])
+        Args:
+            first_page (Tuple[int, int]): Page number and row index of the first row
+            last_page (Tuple[int, int]): Page number and row index of the last row
 
-        for page in range(first_page[0] + 1, last_page[0]):
+        Returns:
+            bool: True if every page was downloaded, False otherwise
+        """
+        pages = range(first_page[0], last_page[0] + 1)
 
-            data = self._download_data(url + f"{page}")
-            if data is None or len(data) == 0:
-                self.recived_data.clear()
-                return False
-            self.recived_data.append(data)
+        with ThreadPoolExecutor(
+            max_workers=self.max_in_flight, thread_name_prefix="police"
+        ) as executor:
+            results = list(executor.map(self._get_page, pages))
 
-        data = self._download_data(url + f"{last_page[0]}")
-        if data is None or len(data) == 0:
+        frames = [data for data in results if data is not None and len(data) > 0]
+        if len(frames) < len(results):
             self.recived_data.clear()
             return False
-        self.recived_data.append(data.loc[: last_page[1]])
+
+        for page, data in zip(pages, frames):
+            if page == last_page[0]:
+                data = data.loc[: last_page[1]]
+            if page == first_page[0]:
+                data = data.loc[first_page[1] :]
+            self.recived_data.append(data)
         return True
 
 
@@ -414,17 +728,14 @@ class HolidaysDataDownloader(Downloader):
             Optional[pd.DataFrame]: The downloaded data as a pandas DataFrame, or None if the download failed.
         """
         sleep(0.7)
-        response = requests.get(url, timeout=5)  # Add timeout argument
+        try:
+            response = cached_get(url, timeout=5)
+        except requests.RequestException as error:
+            logger.error("Failed to download data from url: %s\n%s", url, error)
+            return None
         if response.status_code == 200:
             logger.debug("Successfully downloaded data")
-            soup = BeautifulSoup(response.text, "html.parser")
-            table = soup.find(
-                "table",
-                class_="table table--left table--inner-borders-rows table--full-width table--sticky table--holidaycountry",
-            )
-            if table:
-                return pd.read_html(StringIO(str(table)))[0]
-            return None
+            return extract_table(response.text, HOLIDAYS_TABLE_CLASS)
         logging.error(
             "Failed to download data, error code %s \nfrom url: %s",
             response.status_code,
@@ -439,32 +750,45 @@ class HolidaysDataDownloader(Downloader):
         Returns:
             None
         """
-        indices_to_drop = []
-        for number, row in enumerate(self.data.values):
-            if "National holiday" not in row:
-                indices_to_drop.append(self.data.index[number])
-        self.data = self.data.drop(indices_to_drop)
+        self.data = self.data[self.data.isin(["National holiday"]).any(axis=1)]
 
 
 class WeatherDataDownloader:
     """
     A class for downloading weather data for a specific year.
 
+    Archives are streamed to disk in chunks through a `.part` file. An interrupted
+    download is resumed with an HTTP Range request, and archives recorded as
+    complete in the archive manifest are not downloaded again. An archive is
+    recorded only if its size matches the size in Content-Range (or
+    Content-Length of a full response); a resumed response has to start at the
+    end of the .part file.
+
     Attributes:
     - year (int): The year for which the weather data will be downloaded.
     - url (str): The URL to download the weather data from.
+    - directory (str): Directory where the archives are stored.
+    - manifest (ArchiveManifest): Sizes and checksums of complete archives.
 
     Methods:
     - download(): Downloads the weather data for all months of the specified year.
+    - download_month(m): Downloads the weather data for one month of the specified year.
     """
 
-    def __init__(self, year: int = 2023) -> None:
+    def __init__(
+        self,
+        year: int = 2023,
+        directory: str = ARCHIVES_DIR,
+        manifest: Optional[ArchiveManifest] = None,
+    ) -> None:
         """
         Initializes a WeatherDataDownloader object.
 
         Args:
         - year (int): The year for which the weather data will be downloaded.
                       Defaults to 2023.
+        - directory (str): Directory where the archives are stored.
+        - manifest (Optional[ArchiveManifest]): Manifest shared between downloaders.
 
         Raises:
         - ValueError: If the year is less than 2001 or greater than the current year.
@@ -475,33 +799,176 @@ class WeatherDataDownloader:
             raise ValueError("Year cannot be greater than current year!")
         self.year = year
         self.url = f"https://danepubliczne.imgw.pl/data/dane_pomiarowo_obserwacyjne/dane_meteorologiczne/dobowe/klimat/{self.year}"
+        self.directory = directory
+        self.manifest = manifest or ArchiveManifest(directory)
 
-    def download(self) -> None:
+    def download(self) -> list[str]:
         """
         Downloads the weather data for all months of the specified year.
+
+        Returns:
+        - list[str]: Paths to the complete archives.
         """
-        for i in range(12):
-            self._download(i + 1)
-            time.sleep(0.5)
+        with ThreadPoolExecutor(
+            max_workers=WEATHER_MAX_IN_FLIGHT, thread_name_prefix="weather"
+        ) as executor:
+            paths = list(executor.map(self.download_month, range(1, 13)))
+        return [path for path in paths if path is not None]
 
-    def _download(self, m: int) -> None:
+    def download_month(self, m: int) -> Optional[str]:
         """
         Downloads the weather data for a specific month of the specified year.
 
         Args:
         - m (int): The month for which the weather data will be downloaded.
+
+        Returns:
+        - Optional[str]: Path to the complete archive, or None if the download failed.
         """
-        if m < 10:
-            response = requests.get(self.url + f"/{self.year}_0{m}_k.zip", timeout=5)
-        else:
-            response = requests.get(self.url + f"/{self.year}_{m}_k.zip", timeout=5)
-        if response.status_code == 200:
-            open(f"{self.year}_{m}_k.zip", "wb").write(response.content)
-            return
+        name = f"{self.year}_{m:02d}_k.zip"
+        path = os.path.join(self.directory, name)
+        if self.manifest.is_complete(name):
+            logger.debug("Archive %s is already downloaded", name)
+            return path
+        if is_offline():
+            logger.error("Offline mode, archive %s is not downloaded", name)
+            return None
 
-        logging.error(
-            "Failed to download data, error code %s \nfrom url: %s",
-            response.status_code,
-            self.url + f"/{self.year}_{m}_k.zip",
+        os.makedirs(self.directory, exist_ok=True)
+        part_path = f"{path}.part"
+        url = self.url + f"/{name}"
+        # a .part file that does not match the size announced by the server is
+        # downloaded once more from the start
+        for _ in range(2):
+            complete = self._download_part(url, part_path)
+            if complete is None:
+                return None
+            if complete:
+                os.replace(part_path, path)
+                self.manifest.record(name)
+                return path
+            logger.warning("Archive %s is incomplete, downloading it again", name)
+            if os.path.exists(part_path):
+                os.remove(part_path)
+        return None
+
+    @staticmethod
+    def _download_part(url: str, part_path: str) -> Optional[bool]:
+        """
+        Downloads the archive into the .part file, resuming it if it exists.
+
+        Args:
+        - url (str): URL of the archive.
+        - part_path (str): Path of the .part file.
+
+        Returns:
+        - Optional[bool]: True if the .part file has the size of the archive,
+          False if it does not or the server resumed at another byte, None if
+          the download failed.
+        """
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else None
+        try:
+            with http_client.stream(url, timeout=30, headers=headers) as response:
+                content_range = response.headers.get("Content-Range")
+                if response.status_code in (206, 416):
+                    start, total = parse_content_range(content_range)
+                    if response.status_code == 206 and start != offset:
+                        return False
+                elif response.status_code == 200:
+                    length = response.headers.get("Content-Length")
+                    start, total = 0, int(length) if length else None
+                else:
+                    logger.error(
+                        "Failed to download data, error code %s \nfrom url: %s",
+                        response.status_code,
+                        url,
+                    )
+                    return None
+                if response.status_code != 416:
+                    with open(part_path, "ab" if start else "wb") as file:
+                        for chunk in response.iter_content(WEATHER_CHUNK_SIZE):
+                            file.write(chunk)
+        except requests.RequestException as error:
+            logger.error("Failed to download data from url: %s\n%s", url, error)
+            return None
+
+        size = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        if total is None:
+            # without a size only a full response can be trusted
+            return response.status_code == 200
+        return size == total
+
+
+def parse_content_range(header: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Parses a Content-Range header, e.g. "bytes 100-199/200" or "bytes */200".
+
+    Args:
+        header (Optional[str]): The header.
+
+    Returns:
+        Tuple[Optional[int], Optional[int]]: First byte and size of the whole
+            file, None when they are missing or unknown.
+    """
+    match = re.fullmatch(r"bytes (?:(\d+)-\d+|\*)/(\d+|\*)", (header or "").strip())
+    if match is None:
+        return None, None
+    start, total = match.groups()
+    return (
+        int(start) if start is not None else None,
+        int(total) if total != "*" else None,
+    )
+
+
+def download_weather_archives(start_year: int, end_year: int) -> list[str]:
+    """
+    Downloads the weather archives of all months of the specified years in parallel.
+
+    Args:
+        start_year (int): The start year.
+        end_year (int): The end year.
+
+    Returns:
+        list[str]: Paths to the complete archives.
+    """
+    if start_year > end_year:
+        start_year, end_year = end_year, start_year
+    return download_weather_months(
+        [
+            (year, month)
+            for year in range(start_year, end_year + 1)
+            for month in range(1, 13)
+        ]
+    )
+
+
+def download_weather_months(months: list[Tuple[int, int]]) -> list[str]:
+    """
+    Downloads the weather archives of the months in parallel.
+
+    Args:
+        months (list[Tuple[int, int]]): Year and month of every archive.
+
+    Returns:
+        list[str]: Paths to the complete archives.
+    """
+    manifest = ArchiveManifest()
+    downloaders = {
+        year: WeatherDataDownloader(year, manifest=manifest)
+        for year in sorted({year for year, _ in months})
+    }
+    jobs = [(downloaders[year], month) for year, month in months]
+    with ThreadPoolExecutor(
+        max_workers=WEATHER_MAX_IN_FLIGHT, thread_name_prefix="weather"
+    ) as executor:
+        paths = list(executor.map(lambda job: job[0].download_month(job[1]), jobs))
+
+    complete = [path for path in paths if path is not None]
+    if len(complete) < len(jobs):
+        logger.error(
+            "Failed to download %s of %s weather archives",
+            len(jobs) - len(complete),
+            len(jobs),
         )
-        return
+    return complete
@@ -0,0 +1,232 @@
+import json
+import logging
+import os
+import shutil
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from project.data_processing.hashing import (combine_hashes, dataframe_hash,
+                                             params_hash)
+from project.data_processing.temporal import temporal_features
+from project.setup import RFR_FEATURES, TARGETS, TEMPORAL_FEATURES
+
+logger = logging.getLogger()
+
+FEATURES_DIR = os.path.join("project", "data", "features")
+
+# columns of the feature matrix, RFR_FEATURES are kept together so they can be sliced
+FEATURE_COLUMNS = (
+    TARGETS
+    + ["Precip Sum"]
+    + RFR_FEATURES
+    + [name for name in TEMPORAL_FEATURES if name not in RFR_FEATURES]
+)
+
+
+class FeatureMatrix:
+    """
+    Date-aligned features of all models, memory-mapped from disk.
+
+    The values are one C-contiguous float64 array (days x columns), so models
+    and worker processes map the same pages instead of copying them. Pickling
+    a matrix only passes its directory, the worker maps the file again.
+
+    Attributes:
+        directory (str): Directory with the matrix and its manifest.
+        columns (list[str]): Names of the columns.
+        dates (np.ndarray): Date of every row.
+        values (np.ndarray): Read-only memory-mapped values.
+        input_hash (str): Hash of the datasets the matrix was built from.
+    """
+
+    def __init__(self, directory: str = FEATURES_DIR) -> None:
+        self.directory = directory
+        manifest = read_manifest(directory)
+        if manifest is None:
+            raise FileNotFoundError(f"No feature matrix in {directory}")
+        self.columns: list[str] = manifest["columns"]
+        self.input_hash: str = manifest["input_hash"]
+        self.dates = np.load(os.path.join(directory, "dates.npy"))
+        self.values = np.load(os.path.join(directory, "values.npy"), mmap_mode="r")
+
+    def __reduce__(self) -> Any:
+        return (FeatureMatrix, (self.directory,))
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def column(self, name: str) -> np.ndarray:
+        """Returns a read-only view of one column."""
+        column: np.ndarray = self.values[:, self.columns.index(name)]
+        return column
+
+    def frame(self, columns: Optional[list[str]] = None) -> pd.DataFrame:
+        """
+        Returns the columns as a date-indexed dataframe.
+
+        Adjacent columns are returned as a view of the mapped array.
+
+        Args:
+            columns (Optional[list[str]]): Columns to select, all by default.
+
+        Returns:
+            pd.DataFrame: The features indexed by Date.
+        """
+        columns = self.columns if columns is None else columns
+        positions = [self.columns.index(column) for column in columns]
+        if positions == list(range(positions[0], positions[0] + len(positions))):
+            values = self.values[:, positions[0] : positions[0] + len(positions)]
+        else:
+            values = self.values[:, positions]
+        return pd.DataFrame(
+            values,
+            columns=columns,
+            index=pd.DatetimeIndex(self.dates, name="Date"),
+            copy=False,
+        )
+
+
+def read_manifest(directory: str = FEATURES_DIR) -> Optional[Dict[str, Any]]:
+    """Returns the manifest of the feature matrix, None if it was not built."""
+    path = os.path.join(directory, "manifest.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)  # type: ignore[no-any-return]
+
+
+def feature_inputs(
+    police: pd.DataFrame, weather: pd.DataFrame, calendar: pd.DataFrame
+) -> Dict[str, pd.DataFrame]:
+    """Returns only the parts of the datasets used by the feature matrix."""
+    return {
+        "police": police[["Data"] + TARGETS],
+        "weather": weather[["Date", "Avg Temp", "Precip Sum", "Precip Type"]],
+        "calendar": calendar[["Month", "Day of week", "Weekends", "Holidays"]],
+    }
+
+
+def feature_input_hash(
+    police: pd.DataFrame, weather: pd.DataFrame, calendar: pd.DataFrame
+) -> str:
+    """
+    Returns the hash of the parts of the datasets used by the feature matrix
+    and of the specification of the temporal features.
+    """
+    inputs = feature_inputs(police, weather, calendar)
+    return combine_hashes(
+        *(dataframe_hash(df) for df in inputs.values()), params_hash(TEMPORAL_FEATURES)
+    )
+
+
+def build_features(
+    police: pd.DataFrame, weather: pd.DataFrame, calendar: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Joins police, weather and calendar data into one date-indexed table.
+
+    Temporal features of the police data (TEMPORAL_FEATURES, including
+    last_3_days) are computed from the previous days of the joined rows.
+
+    Args:
+        police (pd.DataFrame): Police data.
+        weather (pd.DataFrame): Weather data.
+        calendar (pd.DataFrame): Day-indexed calendar features.
+
+    Returns:
+        pd.DataFrame: Rows of days present in all datasets with FEATURE_COLUMNS.
+    """
+    weather = weather.set_index("Date")
+    precip_sum = weather["Precip Sum"].astype(float)
+    weather = pd.DataFrame(
+        {
+            "Avg Temp": weather["Avg Temp"].astype(float),
+            "Precip Sum": precip_sum,
+            "S": np.where(weather["Precip Type"] == "S", precip_sum, 0),
+            "W": np.where(weather["Precip Type"] == "W", precip_sum, 0),
+        },
+        index=weather.index,
+    )
+
+    features = police.set_index("Data")[TARGETS]
+    features = features.join(
+        calendar[["Month", "Day of week"]].rename(columns={"Day of week": "Week"})
+    )
+    features = features.join(weather)
+    features = features.join(calendar[["Weekends", "Holidays"]].astype(int))
+    features = features.dropna()
+    # assigned by position, the police data may have more rows of a date
+    temporal = temporal_features(features[TARGETS])
+    features[list(temporal.columns)] = temporal.to_numpy()
+    return features[FEATURE_COLUMNS]
+
+
+def write_feature_matrix(
+    features: pd.DataFrame, input_hash: str, directory: str = FEATURES_DIR
+) -> None:
+    """
+    Writes the features as a memory-mappable array with a column manifest.
+
+    The matrix is written to a temporary directory and moved into place, so a
+    reader never sees a partially written matrix.
+
+    Args:
+        features (pd.DataFrame): Date-indexed features.
+        input_hash (str): Hash of the datasets the features were built from.
+        directory (str): Target directory.
+    """
+    tmp_path = f"{directory}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    values = np.ascontiguousarray(features.to_numpy(dtype=np.float64))
+    np.save(os.path.join(tmp_path, "values.npy"), values)
+    np.save(
+        os.path.join(tmp_path, "dates.npy"),
+        features.index.to_numpy().astype("datetime64[D]"),
+    )
+    manifest = {
+        "columns": list(features.columns),
+        "shape": list(values.shape),
+        "dtype": str(values.dtype),
+        "input_hash": input_hash,
+    }
+    with open(os.path.join(tmp_path, "manifest.json"), "w", encoding="utf-8") as file:
+        json.dump(manifest, file, ensure_ascii=False, indent=1)
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(tmp_path, directory)
+
+
+def load_feature_matrix(
+    police: pd.DataFrame,
+    weather: pd.DataFrame,
+    calendar: pd.DataFrame,
+    directory: str = FEATURES_DIR,
+) -> FeatureMatrix:
+    """
+    Maps the feature matrix, rebuilding it when an input dataset changed.
+
+    Args:
+        police (pd.DataFrame): Police data.
+        weather (pd.DataFrame): Weather data.
+        calendar (pd.DataFrame): Day-indexed calendar features.
+        directory (str): Directory with the matrix.
+
+    Returns:
+        FeatureMatrix: The memory-mapped features.
+    """
+    input_hash = feature_input_hash(police, weather, calendar)
+
+    manifest = read_manifest(directory)
+    if (
+        manifest is None
+        or manifest["input_hash"] != input_hash
+        or manifest["columns"] != FEATURE_COLUMNS
+    ):
+        logger.info("Building feature matrix")
+        write_feature_matrix(
+            build_features(police, weather, calendar), input_hash, directory
+        )
+    return FeatureMatrix(directory)
@@ -0,0 +1,52 @@
+import hashlib
+import json
+from typing import Any
+
+import pandas as pd
+
+
+def dataframe_hash(df: pd.DataFrame) -> str:
+    """
+    Calculates the SHA-256 of the content of a dataframe.
+
+    The hash covers column names, dtypes, the index and all values, so it
+    changes whenever the dataset changes, independently of the storage backend.
+
+    Args:
+        df (pd.DataFrame): The dataframe.
+
+    Returns:
+        str: Hex digest of the dataframe.
+    """
+    digest = hashlib.sha256()
+    for column, dtype in df.dtypes.items():
+        digest.update(f"{column}:{dtype};".encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def combine_hashes(*hashes: str) -> str:
+    """
+    Combines hashes of several inputs into one.
+
+    Args:
+        *hashes (str): Hex digests, the order matters.
+
+    Returns:
+        str: Hex digest of all inputs.
+    """
+    return hashlib.sha256("".join(hashes).encode("utf-8")).hexdigest()
+
+
+def params_hash(params: Any) -> str:
+    """
+    Calculates the SHA-256 of JSON-serializable parameters.
+
+    Args:
+        params (Any): Parameters, dictionaries are hashed independently of key order.
+
+    Returns:
+        str: Hex digest of the parameters.
+    """
+    text = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
@@ -0,0 +1,108 @@
+from datetime import date
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+# month, day, name, first year the holiday is observed
+FIXED_HOLIDAYS: list[Tuple[int, int, str, int]] = [
+    (1, 1, "New Year's Day", 1951),
+    (1, 6, "Epiphany", 2011),
+    (5, 1, "Labor Day / May Day", 1951),
+    (5, 3, "Constitution Day", 1990),
+    (8, 15, "Assumption of Mary", 1989),
+    (11, 1, "All Saints' Day", 1951),
+    (11, 11, "Independence Day", 1989),
+    (12, 24, "Christmas Eve", 2025),
+    (12, 25, "Christmas Day", 1951),
+    (12, 26, "Second Day of Christmas", 1951),
+]
+
+# days after Easter Sunday, name
+EASTER_HOLIDAYS: list[Tuple[int, str]] = [
+    (0, "Easter Sunday"),
+    (1, "Easter Monday"),
+    (49, "Whit Sunday"),
+    (60, "Corpus Christi"),
+]
+
+# holidays declared for a single year
+ONE_OFF_HOLIDAYS: list[Tuple[date, str]] = [
+    (date(2018, 11, 12), "Independence Day Holiday"),
+]
+
+
+def easter_sundays(years: np.ndarray) -> np.ndarray:
+    """
+    Calculates the dates of Easter Sunday with the Gregorian computus.
+
+    Uses the anonymous Gregorian algorithm (Meeus/Jones/Butcher) on whole arrays.
+
+    Args:
+        years (np.ndarray): Years to calculate.
+
+    Returns:
+        np.ndarray: Dates of Easter Sunday as datetime64[D].
+    """
+    years = np.asarray(years, dtype=np.int64)
+    a = years % 19
+    b, c = np.divmod(years, 100)
+    d, e = np.divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = np.divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7  # noqa: E741
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = (h + l - 7 * m + 114) % 31 + 1
+    easter: np.ndarray = (
+        (years - 1970).astype("datetime64[Y]").astype("datetime64[M]")
+        + (month - 1).astype("timedelta64[M]")
+    ).astype("datetime64[D]") + (day - 1).astype("timedelta64[D]")
+    return easter
+
+
+def create_holidays_dataframe(start_year: int, end_year: int) -> pd.DataFrame:
+    """
+    Create a dataframe with Polish national holidays for the given years.
+
+    Holidays are calculated without any network access: fixed-date holidays,
+    holidays relative to Easter and one-off holidays.
+
+    Args:
+        start_year (int): The start year.
+        end_year (int): The end year.
+
+    Returns:
+        pd.DataFrame: A dataframe with Date and Name of every holiday.
+    """
+    if start_year > end_year:
+        start_year, end_year = end_year, start_year
+    years = np.arange(start_year, end_year + 1)
+    first_months = (years - 1970).astype("datetime64[Y]").astype("datetime64[M]")
+
+    dates = []
+    names = []
+    for month, day, name, since in FIXED_HOLIDAYS:
+        months = first_months[years >= since] + np.timedelta64(month - 1, "M")
+        dates.append(months.astype("datetime64[D]") + np.timedelta64(day - 1, "D"))
+        names.append(np.full(len(months), name, dtype=object))
+
+    easter = easter_sundays(years)
+    for days, name in EASTER_HOLIDAYS:
+        dates.append(easter + np.timedelta64(days, "D"))
+        names.append(np.full(len(years), name, dtype=object))
+
+    for holiday, name in ONE_OFF_HOLIDAYS:
+        if start_year <= holiday.year <= end_year:
+            dates.append(np.array([holiday], dtype="datetime64[D]"))
+            names.append(np.array([name], dtype=object))
+
+    holidays = pd.DataFrame(
+        {
+            "Date": pd.to_datetime(np.concatenate(dates)),
+            "Name": np.concatenate(names),
+        }
+    )
+    return holidays.sort_values(by="Date").reset_index(drop=True)
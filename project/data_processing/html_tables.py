@@ -0,0 +1,71 @@
+from typing import Optional
+
+import lxml.html
+import pandas as pd
+
+
+def _typed_column(values: list[Optional[str]]) -> pd.Series:
+    """
+    Converts a column of cell texts to numbers when every non-empty cell is numeric.
+
+    Like `pd.read_html`, commas are treated as thousands separators.
+    """
+    column = pd.Series(values, dtype=object)
+    present = column.dropna()
+    if len(present) == 0:
+        return column
+    numbers = pd.to_numeric(
+        present.str.replace(",", "", regex=False).str.replace(r"\s", "", regex=True),
+        errors="coerce",
+    )
+    if numbers.isna().any():
+        return column
+    if len(present) == len(column):
+        return numbers.reindex(column.index)
+    return numbers.reindex(column.index).astype(float)
+
+
+def extract_table(html: str | bytes, class_name: str) -> Optional[pd.DataFrame]:
+    """
+    Extracts the table with the given class attribute into a typed DataFrame.
+
+    The page is parsed once with lxml. Header names are taken from the last row
+    of `<thead>`; unnamed columns get pandas-style `Unnamed: i` names. Both
+    `<th>` and `<td>` body cells are kept, missing cells become None, and columns
+    whose cells are all numeric are converted to numbers.
+
+    Args:
+        html (str | bytes): The page source.
+        class_name (str): Exact value of the class attribute of the table.
+
+    Returns:
+        Optional[pd.DataFrame]: The table, or None if the page has no such table.
+    """
+    tree = lxml.html.fromstring(html)
+    tables = tree.xpath("//table[@class=$name]", name=class_name)
+    if not tables:
+        return None
+    table = tables[0]
+
+    header_rows = table.xpath("./thead/tr")
+    body_rows = table.xpath("./tbody/tr | ./tr")
+    if not header_rows and body_rows:
+        header_rows, body_rows = body_rows[:1], body_rows[1:]
+    if not header_rows:
+        return None
+
+    header = [
+        cell.text_content().strip() or f"Unnamed: {number}"
+        for number, cell in enumerate(header_rows[-1].xpath("./th | ./td"))
+    ]
+    width = len(header)
+    columns: list[list[Optional[str]]] = [[] for _ in range(width)]
+    for row in body_rows:
+        cells = [cell.text_content().strip() for cell in row.xpath("./th | ./td")]
+        for number in range(width):
+            text = cells[number] if number < len(cells) else ""
+            columns[number].append(text or None)
+
+    return pd.DataFrame(
+        {name: _typed_column(values) for name, values in zip(header, columns)}
+    )
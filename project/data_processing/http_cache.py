@@ -0,0 +1,303 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from project.data_processing.transport import http_client
+from project.setup import HTTP_CACHE_MAX_BYTES
+
+logger = logging.getLogger()
+
+HTTP_CACHE_DIR = os.path.join("project", "data", "cache", "http")
+
+
+class CachedResponse:
+    """
+    Minimal response object returned by the cache.
+
+    Attributes:
+        status_code (int): HTTP status code.
+        content (bytes): Response body.
+        encoding (Optional[str]): Encoding used to decode the body.
+    """
+
+    def __init__(
+        self, status_code: int, content: bytes, encoding: Optional[str] = None
+    ) -> None:
+        self.status_code = status_code
+        self.content = content
+        self.encoding = encoding
+
+    @property
+    def text(self) -> str:
+        """Response body decoded to text."""
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+
+class ResponseCache:
+    """
+    Content-addressed on-disk cache of HTTP GET responses.
+
+    Every cached URL has a small JSON entry with its validators (ETag,
+    Last-Modified) pointing to a body blob named after the SHA-256 of its
+    content, so identical bodies are stored once. Cached entries are revalidated
+    with conditional requests, and in offline mode they are served without
+    touching the network. Least recently used entries are evicted once the blobs
+    exceed max_bytes; a blob is removed as soon as no entry points to it. The
+    entries are read once into an in-memory LRU index, so a write does not scan
+    the cache.
+
+    Attributes:
+        directory (str): Directory with the cache.
+        max_bytes (int): Maximum total size of stored bodies.
+        offline (bool): Whether to serve responses only from the cache.
+    """
+
+    def __init__(
+        self,
+        directory: str = HTTP_CACHE_DIR,
+        max_bytes: int = HTTP_CACHE_MAX_BYTES,
+        offline: bool = False,
+    ) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self._lock = threading.Lock()
+        # loaded on the first write: entries in LRU order, references and sizes of blobs
+        self._index: Optional["OrderedDict[str, Dict[str, Any]]"] = None
+        self._references: Dict[str, int] = {}
+        self._sizes: Dict[str, int] = {}
+        self._total = 0
+
+    def get(self, url: str, timeout: float = 5) -> CachedResponse:
+        """
+        Returns the response for the URL, from the cache when it is still valid.
+
+        In offline mode a URL missing from the cache gets a 504 response,
+        like an `only-if-cached` request.
+
+        Args:
+            url (str): The URL to download.
+            timeout (float): Request timeout in seconds.
+
+        Returns:
+            CachedResponse: The response.
+
+        Raises:
+            requests.RequestException: If the request failed after all retries.
+        """
+        entry = self._read_entry(url)
+        body = self._read_blob(entry["body"]) if entry else None
+        if body is None:
+            entry = None
+
+        if self.offline:
+            if entry is None or body is None:
+                logger.error("Offline mode, %s is not cached", url)
+                return CachedResponse(504, b"")
+            self._touch(url, entry)
+            return CachedResponse(200, body, entry["encoding"])
+
+        headers = {}
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = http_client.get(url, timeout=timeout, headers=headers)
+        if response.status_code == 304 and entry is not None and body is not None:
+            logger.debug("Not modified, using cached %s", url)
+            self._touch(url, entry)
+            return CachedResponse(200, body, entry["encoding"])
+        if response.status_code == 200:
+            encoding = response.encoding or response.apparent_encoding
+            self._store(url, response.content, encoding, response.headers)
+            return CachedResponse(200, response.content, encoding)
+        return CachedResponse(response.status_code, response.content)
+
+    def _entry_path(self, url: str) -> str:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, "entries", f"{key}.json")
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "blobs", digest[:2], digest)
+
+    def _read_entry(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._entry_path(url), "r", encoding="utf-8") as file:
+                entry: Dict[str, Any] = json.load(file)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def _read_blob(self, digest: str) -> Optional[bytes]:
+        try:
+            with open(self._blob_path(digest), "rb") as file:
+                return file.read()
+        except OSError:
+            return None
+
+    def _write_entry(self, url: str, entry: Dict[str, Any]) -> None:
+        path = self._entry_path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(entry, file)
+        os.replace(tmp_path, path)
+
+    def _touch(self, url: str, entry: Dict[str, Any]) -> None:
+        entry["accessed"] = time.time()
+        with self._lock:
+            self._write_entry(url, entry)
+            index = self._load_index()
+            if url in index:
+                index.move_to_end(url)
+
+    def _load_index(self) -> "OrderedDict[str, Dict[str, Any]]":
+        """
+        Returns the entries by URL, least recently used first, reading them once.
+
+        The blob directory is scanned with the entries: the total size counts
+        the blobs actually on disk, and blobs no entry points to are removed.
+        """
+        if self._index is not None:
+            return self._index
+        entries = sorted(self._read_entries(), key=lambda entry: entry["accessed"])
+        self._index = OrderedDict((entry["url"], entry) for entry in entries)
+        for entry in entries:
+            self._references[entry["body"]] = self._references.get(entry["body"], 0) + 1
+
+        blobs_dir = os.path.join(self.directory, "blobs")
+        for root, _, names in os.walk(blobs_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                if name in self._references:
+                    self._sizes[name] = os.path.getsize(path)
+                else:
+                    os.remove(path)
+        self._total = sum(self._sizes.values())
+        return self._index
+
+    def _store(
+        self, url: str, content: bytes, encoding: Optional[str], headers: Any
+    ) -> None:
+        digest = hashlib.sha256(content).hexdigest()
+        entry = {
+            "url": url,
+            "body": digest,
+            "size": len(content),
+            "encoding": encoding,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "accessed": time.time(),
+        }
+        with self._lock:
+            index = self._load_index()
+            if digest not in self._sizes:
+                blob_path = self._blob_path(digest)
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                tmp_path = f"{blob_path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as file:
+                    file.write(content)
+                os.replace(tmp_path, blob_path)
+                self._sizes[digest] = len(content)
+                self._total += len(content)
+            self._references[digest] = self._references.get(digest, 0) + 1
+
+            self._write_entry(url, entry)
+            previous = index.pop(url, None)
+            if previous is not None:
+                self._release(previous["body"])
+            index[url] = entry
+            self._evict()
+
+    def _read_entries(self) -> List[Dict[str, Any]]:
+        entries_dir = os.path.join(self.directory, "entries")
+        if not os.path.isdir(entries_dir):
+            return []
+        entries: List[Dict[str, Any]] = []
+        for name in os.listdir(entries_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(
+                    os.path.join(entries_dir, name), "r", encoding="utf-8"
+                ) as file:
+                    entries.append(json.load(file))
+            except (OSError, ValueError):
+                continue
+        return entries
+
+    def _release(self, digest: str) -> None:
+        """Drops a reference to the blob and removes it when it was the last one."""
+        self._references[digest] -= 1
+        if self._references[digest] > 0:
+            return
+        del self._references[digest]
+        self._total -= self._sizes.pop(digest, 0)
+        try:
+            os.remove(self._blob_path(digest))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self) -> None:
+        """
+        Removes least recently used entries until the bodies fit in max_bytes.
+
+        Called with the lock held, the sizes come from the index, so a write
+        does not read the other entries.
+        """
+        index = self._load_index()
+        while self._total > self.max_bytes and index:
+            url, entry = index.popitem(last=False)
+            try:
+                os.remove(self._entry_path(url))
+            except FileNotFoundError:
+                pass
+            self._release(entry["body"])
+            logger.debug("Evicted %s from cache", url)
+
+
+response_cache = ResponseCache()
+
+
+def cached_get(url: str, timeout: float = 5) -> CachedResponse:
+    """
+    Downloads the URL through the shared response cache.
+
+    Args:
+        url (str): The URL to download.
+        timeout (float): Request timeout in seconds.
+
+    Returns:
+        CachedResponse: The response.
+
+    Raises:
+        requests.RequestException: If the request failed after all retries.
+    """
+    return response_cache.get(url, timeout)
+
+
+def set_offline(offline: bool) -> None:
+    """
+    Switches the shared response cache to serving only cached responses.
+
+    Args:
+        offline (bool): Whether to stay offline.
+    """
+    response_cache.offline = offline
+
+
+def is_offline() -> bool:
+    """
+    Checks whether downloads are served only from local caches.
+
+    Returns:
+        bool: True in offline mode.
+    """
+    return response_cache.offline
@@ -0,0 +1,76 @@
+import json
+import os
+from typing import Any, Dict, Optional
+
+from project.data_processing.features import FEATURES_DIR, read_manifest
+from project.data_processing.hashing import params_hash
+from project.setup import MODEL_PARAMS, TUNING_SPACES
+
+TUNING_DIR = os.path.join("project", "data", "tuning")
+
+
+def tuning_path(name: str, directory: str = TUNING_DIR) -> str:
+    """Returns the path of the tuning result of the model."""
+    return os.path.join(directory, f"{name}.json")
+
+
+def read_tuning(name: str, directory: str = TUNING_DIR) -> Optional[Dict[str, Any]]:
+    """
+    Reads the last tuning result of the model.
+
+    Args:
+        name (str): Name of the model, a key of MODEL_PARAMS.
+        directory (str): Directory with the tuning results.
+
+    Returns:
+        Optional[Dict[str, Any]]: The result, None if the model was not tuned.
+    """
+    path = tuning_path(name, directory)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)  # type: ignore[no-any-return]
+
+
+def save_tuning(name: str, result: Dict[str, Any], directory: str = TUNING_DIR) -> None:
+    """
+    Saves the tuning result of the model.
+
+    Args:
+        name (str): Name of the model.
+        result (Dict[str, Any]): The result with the best parameters in "best_params".
+        directory (str): Directory with the tuning results.
+    """
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{tuning_path(name, directory)}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(result, file, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, tuning_path(name, directory))
+
+
+def model_params(
+    name: str, directory: str = TUNING_DIR, features_dir: str = FEATURES_DIR
+) -> Dict[str, Any]:
+    """
+    Returns the hyperparameters the model is trained with.
+
+    The defaults from MODEL_PARAMS are overridden by the best parameters
+    found by the last tuning, so tuned parameters are reused by later runs.
+    A tuning of other features or of another search space is ignored until
+    the model is tuned again.
+
+    Args:
+        name (str): Name of the model, a key of MODEL_PARAMS.
+        directory (str): Directory with the tuning results.
+        features_dir (str): Directory with the feature matrix.
+
+    Returns:
+        Dict[str, Any]: The hyperparameters.
+    """
+    tuning = read_tuning(name, directory) or {}
+    manifest = read_manifest(features_dir) or {}
+    if tuning.get("data_hash") != manifest.get("input_hash") or tuning.get(
+        "search_hash"
+    ) != params_hash(TUNING_SPACES[name]):
+        tuning = {}
+    return {**MODEL_PARAMS[name], **tuning.get("best_params", {})}
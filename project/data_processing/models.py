@@ -1,106 +1,99 @@
 import logging
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
 from pandas import DataFrame
 from sklearn.compose import ColumnTransformer
 from sklearn.ensemble import RandomForestRegressor
-from sklearn.metrics import make_scorer, mean_absolute_error, r2_score
-from sklearn.model_selection import GridSearchCV, train_test_split
+from sklearn.kernel_approximation import Nystroem, RBFSampler
+from sklearn.metrics import mean_absolute_error, r2_score
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline, make_pipeline
 from sklearn.preprocessing import StandardScaler
-from sklearn.svm import SVR
+from sklearn.svm import SVR, LinearSVR
 
+from project.data_processing.features import FeatureMatrix
+from project.data_processing.model_params import model_params
+from project.data_processing.registry import ModelRegistry, model_registry
+from project.setup import (MODEL_PARAMS, RFR_FEATURES, SVR_COMPONENTS,
+                           SVR_ENGINE, SVR_FEATURES, TARGETS)
 from project.setup_logging import setup_logging
 
 logger = logging.getLogger()
 setup_logging()
 
+# continuous SVR features, the other SVR features are 0/1 flags
+SCALED_FEATURES = ["Avg Temp", "Precip Sum", "last_3_days"]
 
-def get_random_sum(series: DataFrame, count: int) -> int:
-    """
-    Calculates the sum of a random sample from a given series.
-
-    Args:
-        series (DataFrame): The series from which to draw the random sample.
-        count (int): The number of elements to include in the random sample.
 
-    Returns:
-        int: The sum of the random sample.
+def split_rows(count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns train and test rows shared by all models and targets."""
+    return train_test_split(  # type: ignore[no-any-return]
+        np.arange(count), test_size=0.3, random_state=42
+    )
 
-    Raises:
-        ValueError: If the count is greater than the length of the series.
 
-    """
-    if len(series) < count:
-        raise ValueError("Count is bigger than series")
-    return np.sum(np.random.choice(series, count, replace=False))  # type: ignore[no-any-return]
+def make_scaler() -> ColumnTransformer:
+    """Returns an unfitted scaler of the continuous SVR features."""
+    return ColumnTransformer(
+        [("somename", StandardScaler(), SCALED_FEATURES)],
+        remainder="passthrough",
+    )
 
 
-def prepare_model_svr(
-    police: DataFrame,
-    weather: DataFrame,
-    holidays: DataFrame,
-    weekends: DataFrame,
-    start_year: int,
-    end_year: int,
-    prediction: list[float],
-) -> None:
+def train_svr(
+    features: FeatureMatrix, params: Optional[Dict[str, Any]] = None
+) -> Tuple[Dict[str, Pipeline], Dict[str, Dict[str, float]]]:
     """
-    Prepare model for SVR regression.
+    Train models for SVR regression.
     SVR use for prediction:
         -Average temperature
         -Precipitation sum
         -Weekends
         -Holidays
         -Last 3 days accidents
-    """
-    weather = weather.drop(columns=["Precip Type"])
-    police = police.set_index("Data")
-
-    police = police[["Wypadki drogowe", "Zabici w wypadkach", "Ranni w wypadkach"]]
 
-    police = police.join(weather.set_index("Date"))
-    police = police.join(prepare_weekends(weekends, start_year, end_year))
-    police = police.join(
-        prepare_holidays(holidays.drop(columns=["Name"]), start_year, end_year)
-    )
-    police = police.dropna()
-    shifted_accidents = police["Wypadki drogowe"].shift(1)
-    police["last_3_days"] = shifted_accidents.rolling(window=3, min_periods=1).sum()
-    police.iloc[0, police.columns.get_loc("last_3_days")] = get_random_sum(
-        police["Wypadki drogowe"], 3
-    )
-    police.iloc[1, police.columns.get_loc("last_3_days")] += get_random_sum(
-        police["Wypadki drogowe"], 2
-    )
-    police.iloc[2, police.columns.get_loc("last_3_days")] += get_random_sum(
-        police["Wypadki drogowe"], 1
-    )
+    Features are scaled and split once for all targets, the SVRs of the
+    targets are fitted concurrently (libsvm releases the GIL while fitting).
 
-    y = police[["Wypadki drogowe"]]
+    Args:
+        features (FeatureMatrix): Training data.
+        params (Optional[Dict[str, Any]]): Hyperparameters, see make_svr.
 
-    X = police.drop(
-        columns=["Wypadki drogowe", "Zabici w wypadkach", "Ranni w wypadkach"]
-    )
-    run_svr(X, y, prediction, "Wypadki drogowe")
-    y = police[["Zabici w wypadkach"]]
-    run_svr(X, y, prediction, "Zabici w wypadkach")
-    y = police[["Ranni w wypadkach"]]
-    run_svr(X, y, prediction, "Ranni w wypadkach")
-
-
-def prepare_model_rfr(
-    police: DataFrame,
-    weather: DataFrame,
-    holidays: DataFrame,
-    weekends: DataFrame,
-    start_year: int,
-    end_year: int,
-    prediction: list[float],
-) -> None:
-    """
-    Prepare model for Random Forest regression.
+    Returns:
+        Tuple[Dict[str, Pipeline], Dict[str, Dict[str, float]]]: Fitted scaler
+            and SVR for every target and their MAE and score.
+    """
+    ct = make_scaler()
+    X = ct.fit_transform(features.frame(SVR_FEATURES))
+    y = features.frame(TARGETS).to_numpy()
+    train, test = split_rows(len(X))
+
+    with ThreadPoolExecutor(
+        max_workers=len(TARGETS), thread_name_prefix="svr"
+    ) as executor:
+        fitted = list(
+            executor.map(
+                lambda i: run_svr(
+                    X[train], X[test], y[train, i], y[test, i], TARGETS[i], params
+                ),
+                range(len(TARGETS)),
+            )
+        )
+    models = {
+        target: Pipeline([("scale", ct), ("svr", svr)])
+        for target, (svr, _) in zip(TARGETS, fitted)
+    }
+    return models, {target: metrics for target, (_, metrics) in zip(TARGETS, fitted)}
+
+
+def train_rfr(
+    features: FeatureMatrix, params: Optional[Dict[str, Any]] = None
+) -> Tuple[RandomForestRegressor, Dict[str, Dict[str, float]]]:
+    """
+    Train model for Random Forest regression.
     Random Forest use for prediction:
         -Month
         -Weekday
@@ -110,124 +103,289 @@ def prepare_model_rfr(
         -Weekends
         -Holidays
         -Last 3 days accidents
+        -Accidents 1 and 7 days ago, their mean of 7 days and EWM of 28 days
+
+    Args:
+        features (FeatureMatrix): Training data.
+        params (Optional[Dict[str, Any]]): Hyperparameters of
+            RandomForestRegressor, MODEL_PARAMS["rfr"] by default.
+
+    Returns:
+        Tuple[RandomForestRegressor, Dict[str, Dict[str, float]]]: Fitted
+            multi-output forest and MAE and score of every target.
     """
-    police = police.set_index("Data")
-    weather = weather.set_index("Date")
-    weather["S"] = np.where(weather["Precip Type"] == "S", weather["Precip Sum"], 0)
-    weather["W"] = np.where(weather["Precip Type"] == "W", weather["Precip Sum"], 0)
+    X = features.frame(RFR_FEATURES)
+    y = features.frame(TARGETS)
+    train, test = split_rows(len(X))
+    return run_rfr(X.iloc[train], X.iloc[test], y.iloc[train], y.iloc[test], params)
 
-    police = police[["Wypadki drogowe", "Zabici w wypadkach", "Ranni w wypadkach"]]
-    police["Month"] = pd.to_datetime(police.index).month
-    police["Week"] = pd.to_datetime(police.index).day_of_week
 
-    police = police.join(weather.drop(columns=["Precip Type", "Precip Sum"]))
-    police = police.join(prepare_weekends(weekends, start_year, end_year))
-    police = police.join(
-        prepare_holidays(holidays.drop(columns=["Name"]), start_year, end_year)
-    )
-    police = police.dropna()
-    shifted_accidents = police["Wypadki drogowe"].shift(1)
-    police["last_3_days"] = shifted_accidents.rolling(window=3, min_periods=1).sum()
-    police.iloc[0, police.columns.get_loc("last_3_days")] = get_random_sum(
-        police["Wypadki drogowe"], 3
-    )
-    police.iloc[1, police.columns.get_loc("last_3_days")] += get_random_sum(
-        police["Wypadki drogowe"], 2
-    )
-    police.iloc[2, police.columns.get_loc("last_3_days")] += get_random_sum(
-        police["Wypadki drogowe"], 1
-    )
+def make_svr(params: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    Returns an unfitted SVR of the engine selected in the parameters.
+
+    "exact" is the kernel SVR, its fit time grows quadratically to cubically
+    with the number of rows. "nystroem" and "rff" map the rows to
+    n_components features approximating the RBF kernel (Nystroem or random
+    Fourier features) and fit a linear SVR on them, in time linear in the
+    number of rows.
+
+    Args:
+        params (Optional[Dict[str, Any]]): Hyperparameters of SVR with "engine"
+            ("exact", "nystroem" or "rff") and "n_components", kernel is always
+            RBF. MODEL_PARAMS["svr"] by default.
+
+    Returns:
+        Any: SVR or a pipeline of the feature map and LinearSVR.
 
-    y = police[["Wypadki drogowe"]]
-    X = police.drop(
-        columns=["Wypadki drogowe", "Zabici w wypadkach", "Ranni w wypadkach"]
+    Raises:
+        ValueError: If the engine is unknown.
+    """
+    params = dict(MODEL_PARAMS["svr"] if params is None else params)
+    engine = params.pop("engine", SVR_ENGINE)
+    n_components = params.pop("n_components", SVR_COMPONENTS)
+    if engine == "exact":
+        return SVR(**params)
+    feature_maps = {"nystroem": Nystroem, "rff": RBFSampler}
+    if engine not in feature_maps:
+        raise ValueError(f"Unknown SVR engine {engine}")
+    return make_pipeline(
+        feature_maps[engine](
+            gamma=params["gamma"], n_components=n_components, random_state=0
+        ),
+        LinearSVR(
+            C=params["C"],
+            epsilon=params.get("epsilon", 0.1),
+            dual=True,
+            max_iter=10_000,
+            random_state=0,
+        ),
     )
-    run_rfr(X, y, prediction, "Wypadki drogowe")
 
-    y = police[["Zabici w wypadkach"]]
-    run_rfr(X, y, prediction, "Zabici w wypadkach")
 
-    y = police[["Ranni w wypadkach"]]
-    run_rfr(X, y, prediction, "Ranni w wypadkach")
+def make_rfr(
+    params: Optional[Dict[str, Any]] = None, n_jobs: int = -1
+) -> RandomForestRegressor:
+    """Returns an unfitted Random Forest with the hyperparameters, MODEL_PARAMS["rfr"] by default."""
+    if params is None:
+        params = MODEL_PARAMS["rfr"]
+    return RandomForestRegressor(**params, n_jobs=n_jobs)
 
 
 def run_svr(
-    X: DataFrame, y: DataFrame, to_predit: list[float], predcit_name: str
-) -> None:
-    """Run SVR model."""
-    ct = ColumnTransformer(
-        [("somename", StandardScaler(), ["Avg Temp", "Precip Sum", "last_3_days"])],
-        remainder="passthrough",
-    )
-    X = ct.fit_transform(
-        X[["Avg Temp", "Precip Sum", "Weekends", "Holidays", "last_3_days"]]
-    )
-
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.3, random_state=42
-    )
-    svr = SVR(kernel="rbf", C=4, gamma=0.1)
-    # svr = find_best_parameters(SVR(), {"C": [1, 2, 4], "gamma": [0.001 ,0.1, 1, 10]}, X_train, y_train)
-    svr.fit(X_train, np.ravel(y_train))
-    logger.info(f"SVR prediction for {predcit_name}")
+    X_train: np.ndarray,
+    X_test: np.ndarray,
+    y_train: np.ndarray,
+    y_test: np.ndarray,
+    predict_name: str,
+    params: Optional[Dict[str, Any]] = None,
+) -> Tuple[Any, Dict[str, float]]:
+    """Run SVR model for one target, returns the model with its MAE and score."""
+    if params is None:
+        params = MODEL_PARAMS["svr"]
+    svr = make_svr(params)
+    svr.fit(X_train, y_train)
+    logger.info(f"Trained SVR ({params.get('engine', SVR_ENGINE)}) for {predict_name}")
     # logger.info(f"SVR parameters: {svr.get_params()}")
-    logger.info(f"MAE: {mean_absolute_error(y_test, svr.predict(X_test))}")
-    logger.info(f"SVR score: {svr.score(X_test, y_test)}")
-    logger.info(
-        f"SVR prediction for {to_predit}:{svr.predict(pd.DataFrame([to_predit]))}"
-    )
+    return svr, {
+        "mae": float(mean_absolute_error(y_test, svr.predict(X_test))),
+        "score": float(svr.score(X_test, y_test)),
+    }
 
 
 def run_rfr(
-    X: DataFrame, y: DataFrame, to_predit: list[float], predcit_name: str
-) -> None:
-    """Run Random Forest model."""
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.3, random_state=42
-    )
-    rfr = RandomForestRegressor(max_depth=7, n_estimators=100)
-    # rfr = find_best_parameters(RandomForestRegressor(), {"n_estimators": [10, 100, 1000], "max_depth": [3,5,7]}, X_train, y_train)
-    rfr.fit(X_train, np.ravel(y_train))
-
-    to_predit_dict: Dict[str, float] = dict(zip(X.columns, to_predit))
-    logger.info(f"Random forest regressor prediction for {predcit_name}")
+    X_train: DataFrame,
+    X_test: DataFrame,
+    y_train: DataFrame,
+    y_test: DataFrame,
+    params: Optional[Dict[str, Any]] = None,
+) -> Tuple[RandomForestRegressor, Dict[str, Dict[str, float]]]:
+    """Run one multi-output Random Forest model, returns it with MAE and score of every target."""
+    rfr = make_rfr(params)
+    rfr.fit(X_train, y_train)
+    logger.info(f"Trained random forest regressor for {list(y_train.columns)}")
     # logger.info(f"Random forest parameters: {rfr.get_params()}")
-    logger.info(f"MAE: {mean_absolute_error(y_test, rfr.predict(X_test))}")
-    logger.info(f"Random forest regressor score: {rfr.score(X_test, y_test)}")
-    logger.info(
-        f"Random forest regressor prediction for {to_predit_dict}:{rfr.predict(pd.DataFrame([to_predit_dict]))}"
-    )
 
+    predicted = rfr.predict(X_test)
+    mae = mean_absolute_error(y_test, predicted, multioutput="raw_values")
+    score = r2_score(y_test, predicted, multioutput="raw_values")
+    return rfr, {
+        target: {"mae": float(mae[i]), "score": float(score[i])}
+        for i, target in enumerate(y_train.columns)
+    }
 
-def find_best_parameters(model, parameters, X, y, verbose=2, n_jobs=-1):  # type: ignore[no-untyped-def]
-    grid_object = GridSearchCV(
-        model,
-        parameters,
-        scoring=make_scorer(r2_score),
-        verbose=verbose,
-        n_jobs=n_jobs,
-        cv=10,
-    )
-    """Find best parameters for model."""
-    grid_object = grid_object.fit(X, y)
-    return grid_object.best_estimator_
 
+# name in the registry -> name in logs
+MODEL_NAMES = {"svr": "SVR", "rfr": "Random forest regressor"}
 
-def prepare_holidays(holidays: DataFrame, start_year: int, end_year: int) -> DataFrame:
-    """Prepare holidays DataFrame for model."""
-    date_range = pd.date_range(
-        start=f"{start_year}-01-01", end=f"{end_year}-12-31", freq="D"
-    )
-    df = pd.DataFrame(0, index=date_range, columns=["Holidays"])
-    df.loc[holidays["Date"], "Holidays"] = 1
-    return df
+# name in the registry -> train function and features
+MODELS: Dict[str, Tuple[Callable[[FeatureMatrix, Dict[str, Any]], Any], list[str]]] = {
+    "svr": (train_svr, SVR_FEATURES),
+    "rfr": (train_rfr, RFR_FEATURES),
+}
+
+
+def register_model(
+    name: str, features: FeatureMatrix, registry: ModelRegistry = model_registry
+) -> int:
+    """
+    Trains the model, saves it in the registry and makes it the active version.
+
+    The model is trained with model_params, the defaults overridden by the
+    tuned parameters. A version trained on the same data with the same
+    hyperparameters is reused instead of training again.
+
+    Args:
+        name (str): Name of the model, a key of MODELS.
+        features (FeatureMatrix): Training data.
+        registry (ModelRegistry): The registry.
+
+    Returns:
+        int: Version of the model in the registry.
+    """
+    train, columns = MODELS[name]
+    params = model_params(name)
+    version = registry.find(name, features.input_hash, params)
+    if version is not None:
+        logger.info(f"Using saved model {name} version {version}")
+    else:
+        model, metrics = train(features, params)
+        version = registry.save(
+            name,
+            model,
+            features.input_hash,
+            params,
+            features=columns,
+            targets=TARGETS,
+            metrics=metrics,
+        )
+    registry.activate(name, version)
+    return version
+
+
+def align_features(rows: DataFrame, features: list[str]) -> DataFrame:
+    """
+    Validates feature rows and aligns them with the features of a model.
+
+    Columns are reordered to the training order, other columns are dropped
+    and boolean flags are converted to numbers.
+
+    Args:
+        rows (DataFrame): Feature rows, e.g. read from a file.
+        features (list[str]): Features of the model, in the training order.
+
+    Returns:
+        DataFrame: Float features in the training order.
+
+    Raises:
+        ValueError: If a feature is missing, is not numeric or has missing values.
+    """
+    missing = [feature for feature in features if feature not in rows.columns]
+    if missing:
+        raise ValueError(f"Missing features {missing}, expected {features}")
+    extra = [column for column in rows.columns if column not in features]
+    if extra:
+        logger.info(f"Ignoring columns {extra}")
+
+    aligned = rows[features]
+    try:
+        aligned = aligned.astype(np.float64)
+    except (TypeError, ValueError) as error:
+        raise ValueError(f"Features have to be numeric: {error}") from error
+    empty = aligned.isna().any(axis=1).to_numpy()
+    if empty.any():
+        raise ValueError(
+            f"Rows {np.flatnonzero(empty).tolist()[:10]} have missing features"
+        )
+    return aligned
+
+
+def predict(model: Any, rows: DataFrame, targets: list[str]) -> DataFrame:
+    """
+    Predicts the targets with a model returned by train_svr or train_rfr.
 
+    All rows are predicted at once. Pipelines of the targets share the
+    scaler, so the rows are transformed once for all targets.
 
-def prepare_weekends(weekends: DataFrame, start_year: int, end_year: int) -> DataFrame:
-    """Prepare weekends DataFrame for model."""
-    date_range = pd.date_range(
-        start=f"{start_year}-01-01", end=f"{end_year}-12-31", freq="D"
+    Args:
+        model (Any): Pipelines by target or a multi-output model.
+        rows (DataFrame): Features of the predicted days.
+        targets (list[str]): Predicted targets.
+
+    Returns:
+        DataFrame: Predicted targets of every row.
+    """
+    if isinstance(model, dict):
+        transformed: Dict[int, Any] = {}
+        predicted = {}
+        for target in targets:
+            scaler = model[target][:-1]
+            key = id(scaler.steps[0][1])
+            if key not in transformed:
+                transformed[key] = scaler.transform(rows)
+            predicted[target] = model[target][-1].predict(transformed[key])
+        return pd.DataFrame(predicted, index=rows.index)
+    return pd.DataFrame(model.predict(rows), columns=targets, index=rows.index)
+
+
+def predict_batch(
+    name: str,
+    rows: DataFrame,
+    version: Optional[int] = None,
+    registry: ModelRegistry = model_registry,
+) -> DataFrame:
+    """
+    Predicts all targets for every row with a model from the registry.
+
+    Args:
+        name (str): Name of the model.
+        rows (DataFrame): Feature rows with a column for every feature of the model.
+        version (Optional[int]): Version of the model, the active one by default.
+        registry (ModelRegistry): The registry.
+
+    Returns:
+        DataFrame: Aligned features with the predicted targets.
+
+    Raises:
+        ValueError: If the rows do not match the features of the model.
+    """
+    model, meta = registry.load(name, version)
+    features = align_features(rows, meta["features"])
+    return features.join(predict(model, features, meta["targets"]))
+
+
+def predict_saved(
+    name: str,
+    rows: Sequence[Sequence[float]],
+    version: Optional[int] = None,
+    registry: ModelRegistry = model_registry,
+) -> DataFrame:
+    """
+    Predicts the targets with a model from the registry.
+
+    Args:
+        name (str): Name of the model.
+        rows (Sequence[Sequence[float]]): Features of the predicted days, in
+            the order of the features of the model.
+        version (Optional[int]): Version of the model, the active one by default.
+        registry (ModelRegistry): The registry.
+
+    Returns:
+        DataFrame: Predicted targets of every row.
+
+    Raises:
+        ValueError: If a row does not have a value for every feature.
+    """
+    meta = registry.meta(name, version)
+    for row in rows:
+        if len(row) != len(meta["features"]):
+            raise ValueError(
+                f"Model {name} expects {len(meta['features'])} values: {meta['features']}"
+            )
+    predicted = predict_batch(
+        name,
+        pd.DataFrame(rows, columns=meta["features"]),
+        meta["version"],
+        registry,
     )
-    df = pd.DataFrame(0, index=date_range, columns=["Weekends"])
-    df.loc[weekends["Date"], "Weekends"] = 1
-    return df
+    return predicted[meta["targets"]]
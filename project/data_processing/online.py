@@ -0,0 +1,281 @@
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.kernel_approximation import RBFSampler
+from sklearn.linear_model import SGDRegressor
+from sklearn.preprocessing import StandardScaler
+
+from project.data_processing.features import FeatureMatrix
+from project.data_processing.hashing import params_hash
+from project.data_processing.model_params import model_params
+from project.data_processing.models import SCALED_FEATURES, align_features
+from project.setup import (BACKTEST_EPOCHS, BACKTEST_LEARNING_RATE,
+                           ONLINE_EPOCHS, SVR_FEATURES, TARGETS)
+
+logger = logging.getLogger()
+
+ONLINE_DIR = os.path.join("project", "data", "online")
+
+# days summed in last_3_days
+RECENT_DAYS = 3
+
+
+class IncrementalSVR:
+    """
+    Linear SVR on random Fourier features, updated with the new rows only.
+
+    The incremental counterpart of the "rff" engine of make_svr. Continuous
+    features and targets are standardized with the means and variances of the
+    rows of the first update, the scalers are frozen afterwards so the
+    weights already learned keep their meaning; a new IncrementalSVR (see
+    OnlineSVR.retrain) fits them again. The rows are mapped by a fixed RBFSampler
+    and an SGDRegressor with the epsilon-insensitive loss of SVR is trained
+    for every target with `epochs` shuffled passes over the new rows. The
+    step size is constant, a decaying one would stop learning from later
+    rows.
+
+    Attributes:
+        scaler (StandardScaler): Scaler of the continuous features.
+        target_scaler (StandardScaler): Scaler of the targets.
+        feature_map (RBFSampler): Random Fourier features of the RBF kernel.
+        regressors (list[SGDRegressor]): Linear SVR of every target.
+    """
+
+    def __init__(
+        self, params: Dict[str, Any], features: list[str], epochs: int = BACKTEST_EPOCHS
+    ) -> None:
+        self.params = params
+        self.epochs = epochs
+        self.scaled = [features.index(feature) for feature in SCALED_FEATURES]
+        self.scaler = StandardScaler()
+        self.target_scaler = StandardScaler()
+        self.feature_map = RBFSampler(
+            gamma=params["gamma"], n_components=params["n_components"], random_state=0
+        )
+        self.regressors: list[SGDRegressor] = []
+        self._rng = np.random.default_rng(0)
+
+    def _transform(self, X: np.ndarray) -> np.ndarray:
+        X = np.array(X, dtype=np.float64)
+        X[:, self.scaled] = self.scaler.transform(X[:, self.scaled])
+        return self.feature_map.transform(X)  # type: ignore[no-any-return]
+
+    def update(self, X: np.ndarray, y: np.ndarray, start: int = 0) -> None:
+        """Updates the model with rows X[start:], X may hold earlier rows before them."""
+        X_new, y_new = np.asarray(X[start:]), np.asarray(y[start:])
+        if not self.regressors:
+            self.scaler.fit(X_new[:, self.scaled])
+            self.target_scaler.fit(y_new)
+            self.feature_map.fit(X_new)
+            # C of SVR scales the loss of every row, alpha regularizes their mean
+            alpha = 1 / (self.params["C"] * len(X_new))
+            self.regressors = [
+                SGDRegressor(
+                    loss="epsilon_insensitive",
+                    alpha=alpha,
+                    learning_rate="constant",
+                    eta0=BACKTEST_LEARNING_RATE,
+                    random_state=0,
+                )
+                for _ in range(y_new.shape[1])
+            ]
+
+        Z = self._transform(X_new)
+        Y = self.target_scaler.transform(y_new)
+        for i, regressor in enumerate(self.regressors):
+            regressor.epsilon = self.params["epsilon"] / self.target_scaler.scale_[i]
+        for _ in range(self.epochs):
+            order = self._rng.permutation(len(Z))
+            for i, regressor in enumerate(self.regressors):
+                regressor.partial_fit(Z[order], Y[order, i])
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Predicts all targets of the rows."""
+        Z = self._transform(X)
+        Y = np.column_stack([regressor.predict(Z) for regressor in self.regressors])
+        return self.target_scaler.inverse_transform(Y)  # type: ignore[no-any-return]
+
+
+class OnlineSVR:
+    """
+    SVR updated day by day, with its state persisted between runs.
+
+    absorb takes the police, weather and calendar values of new days and
+    updates the model with them only; last_3_days is computed from the
+    accidents of the last days kept in the state. The cost of absorbing a
+    day does not depend on the length of the history. retrain fits the
+    model again on the full history, e.g. after the hyperparameters change.
+
+    Attributes:
+        directory (str): Directory with the saved state.
+        model (IncrementalSVR): The model.
+        last_date (np.datetime64): Last absorbed day.
+        recent (deque[float]): Accidents of the last RECENT_DAYS days.
+        rows (int): Days the model learned from.
+        params_hash (str): Hash of the hyperparameters of the model.
+    """
+
+    def __init__(self, params: Dict[str, Any], directory: str = ONLINE_DIR) -> None:
+        self.directory = directory
+        self.params_hash = params_hash(params)
+        self.model = IncrementalSVR(params, SVR_FEATURES)
+        self.last_date: Optional[np.datetime64] = None
+        self.recent: deque[float] = deque(maxlen=RECENT_DAYS)
+        self.rows = 0
+
+    @staticmethod
+    def path(directory: str = ONLINE_DIR) -> str:
+        """Returns the path of the saved state."""
+        return os.path.join(directory, "svr.joblib")
+
+    @classmethod
+    def load(cls, directory: str = ONLINE_DIR) -> Optional["OnlineSVR"]:
+        """Loads the saved state, None if there is none."""
+        path = cls.path(directory)
+        if not os.path.exists(path):
+            return None
+        online: OnlineSVR = joblib.load(path)
+        online.directory = directory
+        return online
+
+    def save(self) -> None:
+        """Saves the state, replacing the previous one at once."""
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self.path(self.directory)}.tmp"
+        joblib.dump(self, tmp_path)
+        os.replace(tmp_path, self.path(self.directory))
+
+    def retrain(self, features: FeatureMatrix) -> None:
+        """
+        Fits the model again on all days of the feature matrix.
+
+        Args:
+            features (FeatureMatrix): Full history.
+        """
+        rows = pd.DataFrame(np.asarray(features.values), columns=features.columns)
+        self.model = IncrementalSVR(self.model.params, SVR_FEATURES)
+        self.model.update(rows[SVR_FEATURES].to_numpy(), rows[TARGETS].to_numpy())
+        self.model.epochs = ONLINE_EPOCHS
+        self.last_date = features.dates[-1]
+        self.recent = deque(rows["Wypadki drogowe"].iloc[-RECENT_DAYS:], RECENT_DAYS)
+        self.rows = len(rows)
+        logger.info(f"Retrained online SVR on {len(rows)} days")
+
+    def absorb(self, days: pd.DataFrame) -> int:
+        """
+        Updates the model with days after the last absorbed day.
+
+        Args:
+            days (pd.DataFrame): Date-sorted days with a "date" column, the
+                targets and the SVR features except last_3_days. Days that
+                were already absorbed are skipped.
+
+        Returns:
+            int: Number of absorbed days.
+
+        Raises:
+            ValueError: If a column is missing.
+        """
+        columns = ["date"] + TARGETS + [f for f in SVR_FEATURES if f != "last_3_days"]
+        missing = [column for column in columns if column not in days.columns]
+        if missing:
+            raise ValueError(f"Missing columns {missing}")
+        dates = days["date"].to_numpy(dtype="datetime64[D]")
+        if self.last_date is not None:
+            days = days[dates > self.last_date]
+        if days.empty:
+            return 0
+
+        last_3_days = np.empty(len(days))
+        for i, accidents in enumerate(days["Wypadki drogowe"].to_numpy()):
+            last_3_days[i] = sum(self.recent)
+            self.recent.append(float(accidents))
+        days = days.assign(last_3_days=last_3_days)
+        self.model.update(
+            days[SVR_FEATURES].to_numpy(np.float64), days[TARGETS].to_numpy(np.float64)
+        )
+        self.last_date = days["date"].to_numpy(dtype="datetime64[D]")[-1]
+        self.rows += len(days)
+        return len(days)
+
+    def predict(self, rows: pd.DataFrame) -> pd.DataFrame:
+        """Predicts the targets of rows with the SVR features."""
+        return pd.DataFrame(
+            self.model.predict(rows[SVR_FEATURES].to_numpy(np.float64)),
+            columns=TARGETS,
+            index=rows.index,
+        )
+
+
+def new_days(features: FeatureMatrix, last_date: np.datetime64) -> pd.DataFrame:
+    """Returns the days of the feature matrix after last_date, reading only them."""
+    start = int(np.searchsorted(features.dates, last_date, side="right"))
+    days = pd.DataFrame(np.asarray(features.values[start:]), columns=features.columns)
+    days.insert(0, "date", features.dates[start:])
+    return days
+
+
+def update_online(
+    features: FeatureMatrix, retrain: bool = False, directory: str = ONLINE_DIR
+) -> OnlineSVR:
+    """
+    Absorbs the days of the feature matrix the online SVR has not seen.
+
+    The model is retrained on the full history when there is no saved state,
+    when the hyperparameters changed or when retrain is set.
+
+    Args:
+        features (FeatureMatrix): Date-sorted features.
+        retrain (bool): Fit the model again on the full history.
+        directory (str): Directory with the saved state.
+
+    Returns:
+        OnlineSVR: The updated model, saved in directory.
+    """
+    params = model_params("svr")
+    online = OnlineSVR.load(directory)
+    start = time.perf_counter()
+    if (
+        retrain
+        or online is None
+        or online.last_date is None
+        or online.params_hash != params_hash(params)
+    ):
+        online = OnlineSVR(params, directory)
+        online.retrain(features)
+    else:
+        absorbed = online.absorb(new_days(features, online.last_date))
+        logger.info(
+            f"Online SVR absorbed {absorbed} days in "
+            f"{(time.perf_counter() - start) * 1000:.1f} ms"
+        )
+    online.save()
+    return online
+
+
+def predict_online(rows: pd.DataFrame, directory: str = ONLINE_DIR) -> pd.DataFrame:
+    """
+    Predicts all targets for every row with the saved online SVR.
+
+    Args:
+        rows (pd.DataFrame): Feature rows with a column for every SVR feature.
+        directory (str): Directory with the saved state.
+
+    Returns:
+        pd.DataFrame: Aligned features with the predicted targets.
+
+    Raises:
+        FileNotFoundError: If there is no saved online SVR.
+        ValueError: If the rows do not match the SVR features.
+    """
+    online = OnlineSVR.load(directory)
+    if online is None:
+        raise FileNotFoundError("No online SVR, run the pipeline first")
+    features = align_features(rows, SVR_FEATURES)
+    return features.join(online.predict(features))
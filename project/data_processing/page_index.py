@@ -0,0 +1,147 @@
+import bisect
+import json
+import logging
+import os
+import threading
+from datetime import date, timedelta
+from typing import Dict, Optional, Sequence, Tuple
+
+logger = logging.getLogger()
+
+PAGE_INDEX_PATH = os.path.join("project", "data", "cache", "police_pages.json")
+
+
+class PageIndex:
+    """
+    On-disk index of listing pages: row number -> date of the row.
+
+    Listing pages are numbered from the newest entry, so every newly published
+    day shifts all rows. The index stores the dates of the first and the last
+    row of every visited page by row number counted from the newest row, with
+    the number of rows per page. When page 0 is downloaded again, the new rows
+    are counted by finding the old newest row on it and all stored rows are
+    moved forward by that offset, so the index survives new data. It is
+    dropped only if the old newest row is no longer on page 0 or the page
+    size changed.
+
+    The dates of rows between two stored rows are known as well when the
+    stored dates are as many days apart as the rows (one row per day), so a
+    shifted page whose bounds fall between stored rows is not downloaded.
+
+    Attributes:
+        path (str): Path to the JSON file with the index.
+        rows_per_page (Optional[int]): Rows on a full page, None if unknown.
+    """
+
+    def __init__(self, path: str = PAGE_INDEX_PATH) -> None:
+        """
+        Initializes a PageIndex object and loads the index from disk if it exists.
+
+        Args:
+            path (str): Path to the JSON file with the index.
+        """
+        self.path = path
+        self.rows_per_page: Optional[int] = None
+        self._rows: Dict[int, date] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                raw = json.load(file)
+            self.rows_per_page = int(raw["rows_per_page"])
+            self._rows = {
+                int(row): date.fromisoformat(day) for row, day in raw["rows"].items()
+            }
+        except (OSError, ValueError, TypeError, KeyError):
+            logger.warning("Page index %s is corrupted, ignoring it", self.path)
+            self.rows_per_page = None
+            self._rows = {}
+
+    def _date_at(self, row: int) -> Optional[date]:
+        """Returns the date of the row, stored or between two contiguous stored rows."""
+        if row in self._rows:
+            return self._rows[row]
+        rows = sorted(self._rows)
+        position = bisect.bisect(rows, row)
+        if position == 0 or position == len(rows):
+            return None
+        newer, older = rows[position - 1], rows[position]
+        if (self._rows[newer] - self._rows[older]).days != older - newer:
+            return None
+        return self._rows[newer] - timedelta(days=row - newer)
+
+    def get(self, page: int) -> Optional[Tuple[date, date]]:
+        """
+        Returns the stored bounds of the page.
+
+        Args:
+            page (int): Page number.
+
+        Returns:
+            Optional[Tuple[date, date]]: First and last date on the page, or None if unknown.
+        """
+        with self._lock:
+            if self.rows_per_page is None:
+                return None
+            first = self._date_at(page * self.rows_per_page)
+            last = self._date_at((page + 1) * self.rows_per_page - 1)
+        if first is None or last is None:
+            return None
+        return first, last
+
+    def put(self, page: int, first: date, last: date, rows: int) -> None:
+        """
+        Stores the bounds of the page.
+
+        Args:
+            page (int): Page number.
+            first (date): Date of the first row on the page.
+            last (date): Date of the last row on the page.
+            rows (int): Number of rows on the page.
+        """
+        with self._lock:
+            if self.rows_per_page is None:
+                return
+            self._rows[page * self.rows_per_page] = first
+            self._rows[page * self.rows_per_page + rows - 1] = last
+
+    def validate(self, dates: Sequence[date]) -> None:
+        """
+        Moves the stored rows by the rows published since the index was saved.
+
+        Args:
+            dates (Sequence[date]): Dates of the rows on a fresh page 0, newest first.
+        """
+        with self._lock:
+            offset = None
+            if self.rows_per_page == len(dates) and self._rows.get(0) in dates:
+                offset = list(dates).index(self._rows[0])
+            if offset is None:
+                if self._rows:
+                    logger.info("Police listing has shifted, dropping page index")
+                self._rows = {}
+            elif offset:
+                logger.info("Police listing has %s new rows", offset)
+                self._rows = {row + offset: day for row, day in self._rows.items()}
+            self.rows_per_page = len(dates)
+            self._rows[0] = dates[0]
+            self._rows[len(dates) - 1] = dates[-1]
+
+    def save(self) -> None:
+        """
+        Writes the index to disk.
+        """
+        with self._lock:
+            raw = {
+                "rows_per_page": self.rows_per_page,
+                "rows": {
+                    str(row): day.isoformat() for row, day in sorted(self._rows.items())
+                },
+            }
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump(raw, file)
@@ -0,0 +1,54 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket rate limiter.
+
+    Tokens are refilled continuously at `rate` tokens per second up to `capacity`.
+    Every request takes one token, so short bursts up to `capacity` are allowed
+    while the long-term request rate never exceeds `rate`.
+
+    Attributes:
+        rate (float): Number of tokens added per second.
+        capacity (float): Maximum number of stored tokens.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        """
+        Initializes a TokenBucket object.
+
+        Args:
+            rate (float): Number of tokens added per second.
+            capacity (float): Maximum number of stored tokens. Defaults to 1.
+
+        Raises:
+            ValueError: If rate or capacity is not positive.
+        """
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Blocks until a token is available and takes it.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
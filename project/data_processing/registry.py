@@ -0,0 +1,195 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import joblib
+
+from project.data_processing.hashing import combine_hashes, params_hash
+
+logger = logging.getLogger()
+
+REGISTRY_DIR = os.path.join("project", "data", "models")
+
+
+class ModelRegistry:
+    """
+    Versioned store of fitted models in the 'project/data/models' directory.
+
+    Every version of a model is a joblib file with a JSON file describing it:
+    hash of the training data, hyperparameters, features, targets and metrics.
+    Versions are numbered from 1. The active version, used when no version is
+    given, is recorded in active.json by activate: a reused older version can
+    be active while a newer one exists. Without active.json the highest
+    version is active. Loaded models are kept in memory, so repeated
+    predictions do not read the disk.
+
+    Attributes:
+        directory (str): Directory with the models.
+    """
+
+    def __init__(self, directory: str = REGISTRY_DIR) -> None:
+        self.directory = directory
+        self._loaded: Dict[Tuple[str, int], Any] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name: str, version: int, extension: str) -> str:
+        return os.path.join(self.directory, name, f"v{version:04d}{extension}")
+
+    def versions(self, name: str) -> list[int]:
+        """Returns the saved versions of the model, oldest first."""
+        model_dir = os.path.join(self.directory, name)
+        if not os.path.isdir(model_dir):
+            return []
+        return sorted(
+            int(file[1:-5])
+            for file in os.listdir(model_dir)
+            if file.startswith("v") and file.endswith(".json")
+        )
+
+    def active(self, name: str) -> Optional[int]:
+        """Returns the active version of the model, None if it was not saved."""
+        active_path = os.path.join(self.directory, name, "active.json")
+        if os.path.exists(active_path):
+            with open(active_path, "r", encoding="utf-8") as file:
+                version: int = json.load(file)["version"]
+            return version
+        return max(self.versions(name), default=None)
+
+    def activate(self, name: str, version: int) -> None:
+        """
+        Makes a saved version the active one.
+
+        Args:
+            name (str): Name of the model.
+            version (int): The version.
+
+        Raises:
+            FileNotFoundError: If the version was not saved.
+        """
+        if not os.path.exists(self._path(name, version, ".json")):
+            raise FileNotFoundError(f"No saved model {name} version {version}")
+        active_path = os.path.join(self.directory, name, "active.json")
+        with self._lock:
+            with open(f"{active_path}.tmp", "w", encoding="utf-8") as file:
+                json.dump({"version": version}, file)
+            os.replace(f"{active_path}.tmp", active_path)
+        logger.info("Activated model %s version %s", name, version)
+
+    def meta(self, name: str, version: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Returns the description of a saved model.
+
+        Args:
+            name (str): Name of the model.
+            version (Optional[int]): Version, the active one by default.
+
+        Returns:
+            Dict[str, Any]: The description saved with the model.
+
+        Raises:
+            FileNotFoundError: If the model was not saved.
+        """
+        if version is None:
+            version = self.active(name)
+            if version is None:
+                raise FileNotFoundError(f"No saved model {name} in {self.directory}")
+        with open(self._path(name, version, ".json"), "r", encoding="utf-8") as file:
+            return json.load(file)  # type: ignore[no-any-return]
+
+    def find(self, name: str, data_hash: str, params: Dict[str, Any]) -> Optional[int]:
+        """
+        Finds the latest version trained on the data with the hyperparameters.
+
+        Args:
+            name (str): Name of the model.
+            data_hash (str): Hash of the training data.
+            params (Dict[str, Any]): Hyperparameters of the model.
+
+        Returns:
+            Optional[int]: The version, None if no such model was saved.
+        """
+        key = combine_hashes(data_hash, params_hash(params))
+        for version in reversed(self.versions(name)):
+            if self.meta(name, version)["key"] == key:
+                return version
+        return None
+
+    def save(
+        self,
+        name: str,
+        model: Any,
+        data_hash: str,
+        params: Dict[str, Any],
+        **meta: Any,
+    ) -> int:
+        """
+        Saves the model as a new version.
+
+        The files are written under temporary names and moved into place, the
+        JSON file last, so a partially written version is never listed.
+
+        Args:
+            name (str): Name of the model.
+            model (Any): The fitted model.
+            data_hash (str): Hash of the training data.
+            params (Dict[str, Any]): Hyperparameters of the model.
+            **meta (Any): Other JSON-serializable description, e.g. metrics.
+
+        Returns:
+            int: The new version.
+        """
+        with self._lock:
+            os.makedirs(os.path.join(self.directory, name), exist_ok=True)
+            version = max(self.versions(name), default=0) + 1
+            description = {
+                "name": name,
+                "version": version,
+                "key": combine_hashes(data_hash, params_hash(params)),
+                "data_hash": data_hash,
+                "params": params,
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                **meta,
+            }
+
+            model_path = self._path(name, version, ".joblib")
+            joblib.dump(model, f"{model_path}.tmp")
+            os.replace(f"{model_path}.tmp", model_path)
+            meta_path = self._path(name, version, ".json")
+            with open(f"{meta_path}.tmp", "w", encoding="utf-8") as file:
+                json.dump(description, file, ensure_ascii=False, indent=1)
+            os.replace(f"{meta_path}.tmp", meta_path)
+            self._loaded[(name, version)] = model
+
+        logger.info("Saved model %s version %s", name, version)
+        return version
+
+    def load(
+        self, name: str, version: Optional[int] = None
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Loads a saved model.
+
+        Args:
+            name (str): Name of the model.
+            version (Optional[int]): Version, the active one by default.
+
+        Returns:
+            Tuple[Any, Dict[str, Any]]: The fitted model and its description.
+
+        Raises:
+            FileNotFoundError: If the model was not saved.
+        """
+        meta = self.meta(name, version)
+        key = (name, meta["version"])
+        with self._lock:
+            if key not in self._loaded:
+                self._loaded[key] = joblib.load(
+                    self._path(name, meta["version"], ".joblib")
+                )
+            return self._loaded[key], meta
+
+
+model_registry = ModelRegistry()
@@ -1,14 +1,13 @@
-import os
-
 import pandas as pd
 
+from project.data_processing.storage import save_dataset
+
 
 def save_police_data_to_file(police_data: pd.DataFrame) -> None:
     """
-    Save the police data to a CSV file in the 'project/data' directory.
+    Save the police data in the 'project/data' directory.
 
-    This function saves the police data to a CSV file in the 'project/data' directory.
-    The file is named 'police_data.csv'.
+    The data is stored as the 'police_data' dataset with the default storage backend.
 
     Args:
         police_data: DataFrame containing the police data.
@@ -16,17 +15,14 @@ def save_police_data_to_file(police_data: pd.DataFrame) -> None:
     Returns:
         None
     """
-    if os.path.exists(os.path.join("project", "data", "police_data.csv")):
-        os.remove(os.path.join("project", "data", "police_data.csv"))
-    police_data.to_csv(os.path.join("project", "data", "police_data.csv"), index=False)
+    save_dataset("police_data", police_data)
 
 
 def save_weather_data_to_file(weather_data: pd.DataFrame) -> None:
     """
-    Save the weather data to a CSV file in the 'data' directory.
+    Save the weather data in the 'project/data' directory.
 
-    This function saves the weather data to a CSV file in the 'project/data' directory.
-    The file is named 'weather_data.csv'.
+    The data is stored as the 'weather_data' dataset with the default storage backend.
 
     Args:
         weather_data: DataFrame containing the weather data.
@@ -34,24 +30,14 @@ def save_weather_data_to_file(weather_data: pd.DataFrame) -> None:
     Returns:
         None
     """
-    if os.path.exists(os.path.join("project", "data", "weather_data.csv")):
-        os.remove(os.path.join("project", "data", "weather_data.csv"))
-
-    for file in os.listdir(os.path.join(os.getcwd(), "project", "data")):
-        if file.endswith(".csv") and "k_d_" in file:
-            os.remove(os.path.join(os.getcwd(), "project", "data", f"{file}"))
-
-    weather_data.to_csv(
-        os.path.join("project", "data", "weather_data.csv"), index=False
-    )
+    save_dataset("weather_data", weather_data)
 
 
 def save_holidays_data_to_file(holidays_data: pd.DataFrame) -> None:
     """
-    Save the holidays data to a CSV file in the 'data' directory.
+    Save the holidays data in the 'project/data' directory.
 
-    This function saves the holidays data to a CSV file in the 'data' directory.
-    The file is named 'holidays_data.csv'.
+    The data is stored as the 'holidays_data' dataset with the default storage backend.
 
     Args:
         holidays_data: DataFrame containing the holidays data.
@@ -59,20 +45,14 @@ def save_holidays_data_to_file(holidays_data: pd.DataFrame) -> None:
     Returns:
         None
     """
-    if os.path.exists(os.path.join("project", "data", "holidays_data.csv")):
-        os.remove(os.path.join("project", "data", "holidays_data.csv"))
-
-    holidays_data.to_csv(
-        os.path.join("project", "data", "holidays_data.csv"), index=False
-    )
+    save_dataset("holidays_data", holidays_data)
 
 
 def save_weekends_data_to_file(weekends_data: pd.DataFrame) -> None:
     """
-    Save the weekends data to a CSV file in the 'data' directory.
+    Save the weekends data in the 'project/data' directory.
 
-    This function saves the weekends data to a CSV file in the 'data' directory.
-    The file is named 'weekends_data.csv'.
+    The data is stored as the 'weekends_data' dataset with the default storage backend.
 
     Args:
         weekends_data: DataFrame containing the weekends data.
@@ -80,8 +60,4 @@ def save_weekends_data_to_file(weekends_data: pd.DataFrame) -> None:
     Returns:
         None
     """
-    if os.path.exists(os.path.join("project", "data", "weekends_data.csv")):
-        os.remove(os.path.join("project", "data", "weekends_data.csv"))
-    weekends_data.to_csv(
-        os.path.join("project", "data", "weekends_data.csv"), index=False
-    )
+    save_dataset("weekends_data", weekends_data)
@@ -0,0 +1,342 @@
+import importlib.util
+import json
+import logging
+import os
+import shutil
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from project.setup import STORAGE_BACKEND
+
+logger = logging.getLogger()
+
+DATA_DIR = os.path.join("project", "data")
+
+# column -> dtype of every dataset, "datetime64[ns]" columns hold dates,
+# "category" columns hold a few repeated labels and "str" columns hold text
+SCHEMAS: Dict[str, Dict[str, str]] = {
+    "police_data": {
+        "Data": "datetime64[ns]",
+        "Interwencje": "int32",
+        "Zatrzymani na gorącym uczynku": "int16",
+        "Zatrzymani poszukiwani": "int16",
+        "Kierujący po spożyciu alkoholu": "int16",
+        "Wypadki drogowe": "int16",
+        "Zabici w wypadkach": "int16",
+        "Ranni w wypadkach": "int16",
+    },
+    "weather_data": {
+        "Date": "datetime64[ns]",
+        "Avg Temp": "float32",
+        "Precip Sum": "float32",
+        "Precip Type": "category",
+    },
+    "holidays_data": {
+        "Date": "datetime64[ns]",
+        "Name": "category",
+    },
+    "weekends_data": {
+        "Date": "datetime64[ns]",
+    },
+}
+
+
+def apply_schema(name: str, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Casts the columns of the dataset to the types declared in its schema.
+
+    Integer columns with missing values are kept as floats.
+
+    Args:
+        name (str): Name of the dataset.
+        df (pd.DataFrame): The dataset.
+
+    Returns:
+        pd.DataFrame: The dataset with typed columns.
+    """
+    schema = SCHEMAS[name]
+    df = df.copy()
+    for column in df.columns:
+        dtype = schema.get(column)
+        if dtype is None:
+            continue
+        if dtype.startswith("datetime64"):
+            df[column] = pd.to_datetime(df[column])
+        elif dtype == "str":
+            df[column] = df[column].astype(object)
+        elif dtype == "category" or dtype.startswith("float"):
+            df[column] = df[column].astype(dtype)
+        elif not df[column].isna().any():
+            df[column] = df[column].round().astype(dtype)
+    return df
+
+
+def reading_dtypes(name: str) -> Dict[str, str]:
+    """
+    Returns dtypes for parsing the dataset from text.
+
+    Integer columns are parsed as floats, because they may have missing values.
+
+    Args:
+        name (str): Name of the dataset.
+
+    Returns:
+        Dict[str, str]: Column -> dtype of all columns except dates.
+    """
+    return {
+        column: "float32" if dtype.startswith("int") else dtype
+        for column, dtype in SCHEMAS[name].items()
+        if not dtype.startswith("datetime64")
+    }
+
+
+class StorageBackend(ABC):
+    """
+    Abstract class for storing datasets in the 'project/data' directory.
+
+    Attributes:
+        directory (str): Directory with the datasets.
+    """
+
+    extension = ""
+
+    def __init__(self, directory: str = DATA_DIR) -> None:
+        self.directory = directory
+
+    def path(self, name: str) -> str:
+        """Returns the path of the dataset."""
+        return os.path.join(self.directory, f"{name}{self.extension}")
+
+    def exists(self, name: str) -> bool:
+        """Checks whether the dataset is stored."""
+        return os.path.exists(self.path(name))
+
+    @abstractmethod
+    def save(self, name: str, df: pd.DataFrame) -> None:
+        """
+        Saves the dataset.
+
+        Args:
+            name (str): Name of the dataset.
+            df (pd.DataFrame): The dataset.
+        """
+
+    @abstractmethod
+    def load(self, name: str, columns: Optional[list[str]] = None) -> pd.DataFrame:
+        """
+        Loads the dataset.
+
+        Args:
+            name (str): Name of the dataset.
+            columns (Optional[list[str]]): Columns to load, all by default.
+
+        Returns:
+            pd.DataFrame: The dataset with typed columns.
+        """
+
+
+class CsvBackend(StorageBackend):
+    """Stores datasets as CSV files, used for the files kept in the repository and for export."""
+
+    extension = ".csv"
+
+    def save(self, name: str, df: pd.DataFrame) -> None:
+        df.to_csv(self.path(name), index=False)
+
+    def load(self, name: str, columns: Optional[list[str]] = None) -> pd.DataFrame:
+        df = pd.read_csv(
+            self.path(name), sep=",", usecols=columns, dtype=reading_dtypes(name)
+        )
+        return apply_schema(name, df)
+
+
+class ParquetBackend(StorageBackend):
+    """Stores datasets as Parquet files, requires pyarrow."""
+
+    extension = ".parquet"
+
+    def save(self, name: str, df: pd.DataFrame) -> None:
+        apply_schema(name, df).to_parquet(self.path(name), index=False)
+
+    def load(self, name: str, columns: Optional[list[str]] = None) -> pd.DataFrame:
+        return pd.read_parquet(self.path(name), columns=columns)
+
+
+class NpyBackend(StorageBackend):
+    """
+    Stores every column of a dataset as a separate `.npy` file.
+
+    Text and categorical columns are stored as integer codes with their
+    categories kept in the schema file, so every column can be memory-mapped
+    on load.
+    """
+
+    extension = ".npy"
+
+    def save(self, name: str, df: pd.DataFrame) -> None:
+        df = apply_schema(name, df)
+        tmp_path = f"{self.path(name)}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        columns: list[Dict[str, Any]] = []
+        for number, column in enumerate(df.columns):
+            entry: Dict[str, Any] = {"name": column, "file": f"{number}.npy"}
+            values = df[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                entry["categories"] = values.cat.categories.tolist()
+                entry["categorical"] = True
+                array = values.cat.codes.to_numpy()
+            elif values.dtype == object:
+                codes, categories = pd.factorize(values)
+                entry["categories"] = categories.tolist()
+                array = codes.astype(np.int32)
+            else:
+                array = values.to_numpy()
+            entry["dtype"] = str(array.dtype)
+            np.save(os.path.join(tmp_path, entry["file"]), array)
+            columns.append(entry)
+
+        with open(os.path.join(tmp_path, "schema.json"), "w", encoding="utf-8") as file:
+            json.dump({"columns": columns}, file, ensure_ascii=False, indent=1)
+        shutil.rmtree(self.path(name), ignore_errors=True)
+        os.replace(tmp_path, self.path(name))
+
+    def load(self, name: str, columns: Optional[list[str]] = None) -> pd.DataFrame:
+        with open(
+            os.path.join(self.path(name), "schema.json"), "r", encoding="utf-8"
+        ) as file:
+            stored = json.load(file)["columns"]
+
+        data = {}
+        for entry in stored:
+            if columns is not None and entry["name"] not in columns:
+                continue
+            array = np.load(os.path.join(self.path(name), entry["file"]), mmap_mode="r")
+            if entry.get("categorical"):
+                data[entry["name"]] = pd.Categorical.from_codes(
+                    array, entry["categories"]
+                )
+            elif "categories" in entry:
+                categories = np.array(entry["categories"] + [None], dtype=object)
+                data[entry["name"]] = categories[array]
+            else:
+                data[entry["name"]] = array
+        df = pd.DataFrame(data)
+        if columns is not None:
+            df = df[columns]
+        return df
+
+
+def default_backend() -> StorageBackend:
+    """
+    Returns the backend selected with STORAGE_BACKEND.
+
+    "auto" selects Parquet when pyarrow is installed and `.npy` columns otherwise.
+
+    Returns:
+        StorageBackend: The storage backend.
+    """
+    backend = STORAGE_BACKEND
+    if backend == "auto":
+        backend = "parquet" if importlib.util.find_spec("pyarrow") else "npy"
+    backends: Dict[str, Callable[[], StorageBackend]] = {
+        "parquet": ParquetBackend,
+        "npy": NpyBackend,
+        "csv": CsvBackend,
+    }
+    if backend not in backends:
+        raise ValueError(f"Unknown storage backend {backend}")
+    return backends[backend]()
+
+
+def dataset_exists(name: str) -> bool:
+    """
+    Checks whether the dataset is stored in the default backend or as CSV.
+
+    Args:
+        name (str): Name of the dataset.
+
+    Returns:
+        bool: True if the dataset can be loaded.
+    """
+    return default_backend().exists(name) or CsvBackend().exists(name)
+
+
+def dataset_signature(name: str) -> list[list[int]]:
+    """
+    Returns size and modification time of the stored files of the dataset.
+
+    The signature changes whenever the dataset is saved again, without reading it.
+
+    Args:
+        name (str): Name of the dataset.
+
+    Returns:
+        list[list[int]]: Size and mtime in nanoseconds of the default backend
+            file and of the CSV file, empty for a missing file.
+    """
+    signature = []
+    for path in (default_backend().path(name), CsvBackend().path(name)):
+        if os.path.exists(path):
+            stat = os.stat(path)
+            signature.append([stat.st_size, stat.st_mtime_ns])
+        else:
+            signature.append([])
+    return signature
+
+
+def save_dataset(name: str, df: pd.DataFrame) -> None:
+    """
+    Saves the dataset with the default backend.
+
+    Args:
+        name (str): Name of the dataset.
+        df (pd.DataFrame): The dataset.
+    """
+    default_backend().save(name, df)
+
+
+def load_dataset(name: str, columns: Optional[list[str]] = None) -> pd.DataFrame:
+    """
+    Loads the dataset with the default backend.
+
+    A dataset available only as CSV, or with a newer CSV file, is converted to
+    the default backend first, so the text is parsed only once.
+
+    Args:
+        name (str): Name of the dataset.
+        columns (Optional[list[str]]): Columns to load, all by default.
+
+    Returns:
+        pd.DataFrame: The dataset with typed columns.
+    """
+    backend = default_backend()
+    csv = CsvBackend()
+    if not backend.exists(name) or (
+        csv.exists(name)
+        and os.path.getmtime(csv.path(name)) > os.path.getmtime(backend.path(name))
+    ):
+        logger.info("Converting %s.csv to %s", name, backend.extension)
+        backend.save(name, CsvBackend().load(name))
+    return backend.load(name, columns)
+
+
+def export_csv(name: str) -> None:
+    """
+    Exports the dataset from the default backend to a CSV file.
+
+    Args:
+        name (str): Name of the dataset.
+    """
+    backend = default_backend()
+    if isinstance(backend, CsvBackend):
+        return
+    df = backend.load(name)
+    for column, dtype in SCHEMAS[name].items():
+        if dtype.startswith("datetime64") and column in df.columns:
+            df[column] = df[column].dt.strftime("%Y-%m-%d")
+    CsvBackend().save(name, df)
@@ -0,0 +1,136 @@
+import logging
+import time
+from concurrent.futures import (FIRST_COMPLETED, Future, ThreadPoolExecutor,
+                                wait)
+from typing import Callable, Dict, Optional, Sequence
+
+logger = logging.getLogger()
+
+
+class Task:  # pylint: disable=too-few-public-methods
+    """
+    A named unit of work that may depend on other tasks.
+
+    Attributes:
+        name (str): Unique name of the task.
+        action (Callable[[], None]): Function doing the work.
+        depends_on (Sequence[str]): Names of tasks that have to finish first.
+    """
+
+    def __init__(
+        self, name: str, action: Callable[[], None], depends_on: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.action = action
+        self.depends_on = depends_on
+
+
+class TaskResult:  # pylint: disable=too-few-public-methods
+    """
+    Outcome of a task.
+
+    Attributes:
+        status (str): "done", "failed" or "skipped" when a dependency did not finish.
+        seconds (float): Wall time of the task.
+        error (Optional[BaseException]): Exception raised by a failed task.
+    """
+
+    def __init__(
+        self, status: str, seconds: float = 0.0, error: Optional[BaseException] = None
+    ) -> None:
+        self.status = status
+        self.seconds = seconds
+        self.error = error
+
+
+def _timed(task: Task) -> float:
+    start = time.perf_counter()
+    logger.info("Started %s", task.name)
+    task.action()
+    seconds = time.perf_counter() - start
+    logger.info("Finished %s in %.1f s", task.name, seconds)
+    return seconds
+
+
+def _ready_tasks(pending: list[Task], results: Dict[str, TaskResult]) -> list[Task]:
+    """
+    Removes from pending the tasks that can be started and returns them.
+
+    Tasks depending on a task that did not finish are marked as skipped.
+    """
+    ready = []
+    changed = True
+    while changed:
+        changed = False
+        for task in list(pending):
+            statuses = [results.get(name) for name in task.depends_on]
+            if any(s is not None and s.status != "done" for s in statuses):
+                logger.error("Skipped %s, a dependency did not finish", task.name)
+                results[task.name] = TaskResult("skipped")
+                pending.remove(task)
+                changed = True
+            elif all(s is not None for s in statuses):
+                ready.append(task)
+                pending.remove(task)
+    return ready
+
+
+def run_task_graph(
+    tasks: Sequence[Task], max_workers: Optional[int] = None
+) -> Dict[str, TaskResult]:
+    """
+    Runs the tasks concurrently, each one as soon as its dependencies are done.
+
+    A failing task does not stop the others; only tasks depending on it are
+    skipped.
+
+    Args:
+        tasks (Sequence[Task]): Tasks to run.
+        max_workers (Optional[int]): Maximum number of tasks running at once,
+            by default all tasks may run at once.
+
+    Returns:
+        Dict[str, TaskResult]: Result of every task by its name.
+
+    Raises:
+        ValueError: If a task depends on an unknown task or dependencies form a cycle.
+    """
+    names = {task.name for task in tasks}
+    for task in tasks:
+        missing = set(task.depends_on) - names
+        if missing:
+            raise ValueError(f"Task {task.name} depends on unknown tasks {missing}")
+
+    results: Dict[str, TaskResult] = {}
+    pending = list(tasks)
+    running: Dict[Future[float], Task] = {}
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(
+        max_workers=max_workers or max(len(tasks), 1), thread_name_prefix="task"
+    ) as executor:
+        while pending or running:
+            for task in _ready_tasks(pending, results):
+                running[executor.submit(_timed, task)] = task
+
+            if not running:
+                if pending:
+                    raise ValueError("Tasks have cyclic dependencies")
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = running.pop(future)
+                error = future.exception()
+                if error is None:
+                    results[task.name] = TaskResult("done", future.result())
+                else:
+                    logger.error("Task %s failed: %s", task.name, error)
+                    results[task.name] = TaskResult("failed", error=error)
+
+    logger.info(
+        "Finished %s of %s tasks in %.1f s",
+        sum(result.status == "done" for result in results.values()),
+        len(tasks),
+        time.perf_counter() - start,
+    )
+    return results
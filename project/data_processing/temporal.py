@@ -0,0 +1,150 @@
+import logging
+import os
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from project.data_processing.hashing import (combine_hashes, dataframe_hash,
+                                             params_hash)
+from project.setup import TEMPORAL_FEATURES
+
+logger = logging.getLogger()
+
+TEMPORAL_DIR = os.path.join("project", "data", "temporal")
+
+KINDS = ["lag", "sum", "mean", "std", "ewm"]
+
+
+def check_spec(spec: Dict[str, Tuple[str, str, int]]) -> None:
+    """
+    Validates a specification of temporal features.
+
+    Args:
+        spec (Dict[str, Tuple[str, str, int]]): Feature name -> source column,
+            kind (one of KINDS) and days (lag, window or EWM span).
+
+    Raises:
+        ValueError: If a kind is unknown or the days do not fit the kind.
+    """
+    for name, (_, kind, days) in spec.items():
+        if kind not in KINDS:
+            raise ValueError(f"Unknown kind {kind} of {name}, expected one of {KINDS}")
+        if days < (2 if kind == "std" else 1):
+            raise ValueError(f"Too few days {days} for {kind} of {name}")
+
+
+def warm_up_days(spec: Dict[str, Tuple[str, str, int]]) -> int:
+    """Returns the number of days before the first row needed by the features."""
+    return max([days for _, kind, days in spec.values() if kind != "ewm"] + [1])
+
+
+def window_statistic(
+    kind: str, total: np.ndarray, squares: np.ndarray, days: int
+) -> np.ndarray:
+    """Returns the sum, mean or sample standard deviation of windows from their sums."""
+    if kind == "sum":
+        return total
+    mean = total / days
+    if kind == "mean":
+        return mean
+    variance = (squares - days * mean**2) / (days - 1)
+    return np.sqrt(np.maximum(variance, 0))
+
+
+def compute_temporal_features(
+    frame: pd.DataFrame, spec: Dict[str, Tuple[str, str, int]] = TEMPORAL_FEATURES
+) -> pd.DataFrame:
+    """
+    Computes lags, rolling windows and EWMs of the columns from previous days.
+
+    A feature of a day uses only the days before it, like a forecast made the
+    evening before. Warm-up is deterministic: the days before the first row
+    are taken to equal the first row, so rolling windows of the first days are
+    full and no row is dropped.
+
+    All columns are handled at once: the padded history is built once,
+    rolling sums and sums of squares come from one cumulative sum and every
+    EWM span is one pandas pass over all columns, so a feature costs only a
+    subtraction of two slices.
+
+    Args:
+        frame (pd.DataFrame): Date-sorted rows, one per day.
+        spec (Dict[str, Tuple[str, str, int]]): Feature name -> source column,
+            kind ("lag", "sum", "mean", "std" or "ewm") and days.
+
+    Returns:
+        pd.DataFrame: The features in the order of spec, indexed like frame.
+
+    Raises:
+        ValueError: If the specification is not valid.
+    """
+    check_spec(spec)
+    sources = list(dict.fromkeys(column for column, _, _ in spec.values()))
+    values = frame[sources].to_numpy(dtype=np.float64)
+    pad = warm_up_days(spec)
+    count = len(values)
+
+    history = np.vstack([np.repeat(values[:1], pad, axis=0), values])
+    zeros = np.zeros((1, len(sources)))
+    sums = np.vstack([zeros, np.cumsum(history, axis=0)])
+    squares = np.vstack([zeros, np.cumsum(history**2, axis=0)])
+    ewms = {
+        span: pd.DataFrame(history).ewm(span=span, adjust=False).mean().to_numpy()
+        for span in {days for _, kind, days in spec.values() if kind == "ewm"}
+    }
+
+    features = np.empty((count, len(spec)))
+    for i, (column, kind, days) in enumerate(spec.values()):
+        j = sources.index(column)
+        if kind == "lag":
+            features[:, i] = history[pad - days : pad - days + count, j]
+        elif kind == "ewm":
+            features[:, i] = ewms[days][pad - 1 : pad - 1 + count, j]
+        else:
+            features[:, i] = window_statistic(
+                kind,
+                sums[pad : pad + count, j] - sums[pad - days : pad - days + count, j],
+                squares[pad : pad + count, j]
+                - squares[pad - days : pad - days + count, j],
+                days,
+            )
+    return pd.DataFrame(features, columns=list(spec), index=frame.index)
+
+
+def temporal_features(
+    frame: pd.DataFrame,
+    spec: Dict[str, Tuple[str, str, int]] = TEMPORAL_FEATURES,
+    directory: str = TEMPORAL_DIR,
+) -> pd.DataFrame:
+    """
+    Returns the temporal features, cached by the hash of their inputs.
+
+    The cache is keyed by the source columns and the specification, so
+    rebuilding the feature matrix after a weather or calendar change reuses
+    the features of unchanged police data. Only the latest result is kept.
+
+    Args:
+        frame (pd.DataFrame): Date-sorted rows, one per day.
+        spec (Dict[str, Tuple[str, str, int]]): See compute_temporal_features.
+        directory (str): Cache directory.
+
+    Returns:
+        pd.DataFrame: The features in the order of spec, indexed like frame.
+    """
+    sources = list(dict.fromkeys(column for column, _, _ in spec.values()))
+    key = combine_hashes(dataframe_hash(frame[sources]), params_hash(spec))
+    path = os.path.join(directory, f"{key[:32]}.npy")
+    if os.path.exists(path):
+        values = np.load(path)
+    else:
+        logger.info(f"Computing {len(spec)} temporal features")
+        values = compute_temporal_features(frame, spec).to_numpy()
+        os.makedirs(directory, exist_ok=True)
+        with open(f"{path}.tmp", "wb") as file:
+            np.save(file, values)
+        os.replace(f"{path}.tmp", path)
+        for name in os.listdir(directory):
+            if name.endswith(".npy") and name != os.path.basename(path):
+                os.remove(os.path.join(directory, name))
+    return pd.DataFrame(values, columns=list(spec), index=frame.index)
@@ -0,0 +1,132 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from project.setup import (HTTP_BACKOFF_FACTOR, HTTP_BACKOFF_JITTER,
+                           HTTP_MAX_PER_HOST, HTTP_RETRIES)
+
+
+class HttpClient:
+    """
+    HTTP transport shared by all downloaders.
+
+    A single requests session keeps connections alive between requests. Transient
+    failures (connection errors, 429 and 5xx responses) are retried with
+    exponential backoff and random jitter, honouring Retry-After. Every host has
+    its own limit of concurrent requests.
+
+    Attributes:
+        session (requests.Session): Session with pooled connections.
+        max_per_host (int): Maximum number of concurrent requests to a single host.
+    """
+
+    def __init__(
+        self,
+        retries: int = HTTP_RETRIES,
+        backoff_factor: float = HTTP_BACKOFF_FACTOR,
+        backoff_jitter: float = HTTP_BACKOFF_JITTER,
+        max_per_host: int = HTTP_MAX_PER_HOST,
+    ) -> None:
+        """
+        Initializes a HttpClient object.
+
+        Args:
+            retries (int): Number of retries of a failed request.
+            backoff_factor (float): Base of the exponential backoff in seconds.
+            backoff_jitter (float): Maximum random delay added to every backoff.
+            max_per_host (int): Maximum number of concurrent requests to a single host.
+
+        Raises:
+            ValueError: If max_per_host is less than 1.
+        """
+        if max_per_host < 1:
+            raise ValueError("At least one request per host must be allowed")
+        self.max_per_host = max_per_host
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_jitter,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET", "HEAD"),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=8, pool_maxsize=max_per_host, max_retries=retry
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_slots[host]
+
+    def get(
+        self,
+        url: str,
+        timeout: float = 5,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
+        """
+        Sends a GET request and reads the whole response.
+
+        Args:
+            url (str): The URL to download.
+            timeout (float): Timeout of a single attempt in seconds.
+            headers (Optional[Dict[str, str]]): Additional request headers.
+
+        Returns:
+            requests.Response: The response after retries.
+
+        Raises:
+            requests.RequestException: If the request failed after all retries.
+        """
+        with self._slot(url):
+            return self.session.get(url, timeout=timeout, headers=headers)
+
+    @contextmanager
+    def stream(
+        self,
+        url: str,
+        timeout: float = 5,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Iterator[requests.Response]:
+        """
+        Sends a GET request without reading the body.
+
+        The host slot is held until the block exits, so the body can be consumed
+        with iter_content inside it.
+
+        Args:
+            url (str): The URL to download.
+            timeout (float): Timeout of a single attempt in seconds.
+            headers (Optional[Dict[str, str]]): Additional request headers.
+
+        Yields:
+            requests.Response: The streamed response.
+
+        Raises:
+            requests.RequestException: If the request failed after all retries.
+        """
+        with self._slot(url):
+            response = self.session.get(
+                url, timeout=timeout, headers=headers, stream=True
+            )
+            try:
+                yield response
+            finally:
+                response.close()
+
+
+http_client = HttpClient()
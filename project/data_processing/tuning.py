@@ -0,0 +1,288 @@
+import logging
+import math
+import os
+import time
+from typing import Any, Dict, Tuple
+
+import joblib
+import numpy as np
+from joblib import Parallel, delayed, effective_n_jobs
+from sklearn.metrics import r2_score
+from sklearn.model_selection import KFold, ParameterGrid, ParameterSampler
+
+from project.data_processing.features import FeatureMatrix
+from project.data_processing.hashing import params_hash
+from project.data_processing.model_params import TUNING_DIR, save_tuning
+from project.data_processing.models import (MODELS, make_rfr, make_scaler,
+                                            make_svr, split_rows)
+from project.setup import (MODEL_PARAMS, TARGETS, TUNING_BUDGET_SECONDS,
+                           TUNING_CANDIDATES, TUNING_CV, TUNING_FACTOR,
+                           TUNING_MIN_ROWS, TUNING_SPACES)
+
+logger = logging.getLogger()
+
+FOLDS_DIR = os.path.join(TUNING_DIR, "folds")
+
+# exponent of the growth of the fit time with the training rows, by SVR engine or model
+FIT_TIME_EXPONENTS = {"exact": 2.0, "nystroem": 1.0, "rff": 1.0, "rfr": 1.2}
+
+
+def fold_cache(name: str, features: FeatureMatrix, cv: int = TUNING_CV) -> list[Any]:
+    """
+    Returns preprocessed cross-validation folds of the training rows.
+
+    Only the rows used for training by train_svr and train_rfr are split, the
+    test rows stay unseen. SVR folds are scaled with a scaler fitted on the
+    training part of the fold. The folds are computed once per data hash,
+    saved with joblib and memory-mapped, so joblib passes them to worker
+    processes by file name instead of copying them. Folds of other data or
+    another number of folds are removed.
+
+    Args:
+        name (str): Name of the model, a key of MODELS.
+        features (FeatureMatrix): Training data.
+        cv (int): Number of folds.
+
+    Returns:
+        list[Any]: X_train, y_train, X_test and y_test arrays of every fold.
+    """
+    path = os.path.join(FOLDS_DIR, f"{name}-{cv}-{features.input_hash[:16]}.joblib")
+    if not os.path.exists(path):
+        train, _ = split_rows(len(features))
+        X = features.frame(MODELS[name][1]).iloc[train]
+        y = features.frame(TARGETS).to_numpy()[train]
+
+        folds = []
+        for fold_train, fold_test in KFold(cv, shuffle=True, random_state=0).split(X):
+            X_train, X_test = X.iloc[fold_train], X.iloc[fold_test]
+            if name == "svr":
+                scaler = make_scaler().fit(X_train)
+                X_train, X_test = scaler.transform(X_train), scaler.transform(X_test)
+            folds.append(
+                {
+                    "X_train": np.ascontiguousarray(X_train, dtype=np.float64),
+                    "y_train": np.ascontiguousarray(y[fold_train]),
+                    "X_test": np.ascontiguousarray(X_test, dtype=np.float64),
+                    "y_test": np.ascontiguousarray(y[fold_test]),
+                }
+            )
+        os.makedirs(FOLDS_DIR, exist_ok=True)
+        joblib.dump(folds, f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+        for file in os.listdir(FOLDS_DIR):
+            if file.startswith(f"{name}-") and file != os.path.basename(path):
+                os.remove(os.path.join(FOLDS_DIR, file))
+    return joblib.load(path, mmap_mode="r")  # type: ignore[no-any-return]
+
+
+def score_candidate(
+    name: str, params: Dict[str, Any], fold: Dict[str, np.ndarray], rows: int
+) -> float:
+    """
+    Fits the model on the first rows of the training part of the fold.
+
+    Returns:
+        float: R2 on the test part of the fold, averaged over the targets.
+    """
+    X_train, y_train = fold["X_train"][:rows], fold["y_train"][:rows]
+    if name == "svr":
+        predicted = np.column_stack(
+            [
+                make_svr(params).fit(X_train, y_train[:, i]).predict(fold["X_test"])
+                for i in range(y_train.shape[1])
+            ]
+        )
+    else:
+        predicted = (
+            make_rfr(params, n_jobs=1).fit(X_train, y_train).predict(fold["X_test"])
+        )
+    return float(r2_score(fold["y_test"], predicted))
+
+
+def candidates(name: str, count: int = TUNING_CANDIDATES) -> list[Dict[str, Any]]:
+    """Returns the default parameters first and random candidates from TUNING_SPACES."""
+    space = TUNING_SPACES[name]
+    count = min(count, len(ParameterGrid(space)))
+    sampled = [
+        {**MODEL_PARAMS[name], **params}
+        for params in ParameterSampler(space, n_iter=count, random_state=0)
+    ]
+    default = MODEL_PARAMS[name]
+    return [default] + [params for params in sampled if params != default]
+
+
+def score_pool(
+    parallel: Parallel,
+    name: str,
+    folds: list[Any],
+    pool: list[Dict[str, Any]],
+    rows: int,
+) -> np.ndarray:
+    """Returns the cross-validated R2 of every candidate, averaged over the folds."""
+    scores = parallel(
+        delayed(score_candidate)(name, params, fold, rows)
+        for params in pool
+        for fold in folds
+    )
+    means: np.ndarray = np.asarray(scores).reshape(len(pool), len(folds)).mean(axis=1)
+    return means
+
+
+def first_round(
+    parallel: Parallel,
+    name: str,
+    folds: list[Any],
+    pool: list[Dict[str, Any]],
+    rows: int,
+    seconds: float,
+) -> Tuple[list[Dict[str, Any]], np.ndarray]:
+    """
+    Scores the candidates of the first round in chunks until seconds pass.
+
+    A chunk has as many candidates as there are workers. The candidates that
+    were not scored in time are dropped, so a large pool or slow fits cannot
+    use the whole budget in the first round. pool[0] is always scored.
+
+    Returns:
+        Tuple[list[Dict[str, Any]], np.ndarray]: The scored candidates and
+            their scores.
+    """
+    start = time.perf_counter()
+    chunk = max(1, effective_n_jobs(-1))
+    means = score_pool(parallel, name, folds, pool[:chunk], rows)
+    while len(means) < len(pool) and time.perf_counter() - start < seconds:
+        scored = pool[len(means) : len(means) + chunk]
+        means = np.concatenate([means, score_pool(parallel, name, folds, scored, rows)])
+    if len(means) < len(pool):
+        logger.info(f"Tuning {name}: scored {len(means)} of {len(pool)} candidates")
+    return pool[: len(means)], means
+
+
+def successive_halving(
+    name: str,
+    folds: list[Any],
+    pool: list[Dict[str, Any]],
+    budget: float,
+    min_rows: int = TUNING_MIN_ROWS,
+    factor: int = TUNING_FACTOR,
+) -> Dict[str, Any]:
+    """
+    Selects the best parameters with successive halving under a time budget.
+
+    Every round scores the remaining candidates with cross-validation on
+    `rows` training rows, keeps the best 1/factor of them and multiplies the
+    rows by factor. The first round gets 1/factor of the budget (see
+    first_round). The defaults, pool[0], stay in every round, so the best
+    candidate is compared with them on the same rows. Tuning stops when one
+    candidate is left, all rows are used, or the next round would not finish
+    within the budget; the best candidate of the last round is returned.
+
+    The time of the next round is estimated from the last one: the fit time
+    grows with the rows to the power of FIT_TIME_EXPONENTS and in proportion
+    to the number of candidates.
+
+    Args:
+        name (str): Name of the model.
+        folds (list[Any]): Folds from fold_cache.
+        pool (list[Dict[str, Any]]): Candidate parameters, the defaults first.
+        budget (float): Wall-clock budget in seconds.
+        min_rows (int): Training rows in the first round.
+        factor (int): Rows multiplier and candidates divisor between rounds.
+
+    Returns:
+        Dict[str, Any]: Best parameters, their score, score of the defaults,
+            rows and rounds.
+    """
+    start = time.perf_counter()
+    max_rows = min(len(fold["X_train"]) for fold in folds)
+    rows = min(min_rows, max_rows)
+    default = pool[0]
+    exponent = max(FIT_TIME_EXPONENTS[params.get("engine", name)] for params in pool)
+    rounds: list[Dict[str, Any]] = []
+    with Parallel(n_jobs=-1) as parallel:
+        while True:
+            round_start = time.perf_counter()
+            if rounds:
+                means = score_pool(parallel, name, folds, pool, rows)
+            else:
+                pool, means = first_round(
+                    parallel, name, folds, pool, rows, budget / factor
+                )
+            default_score = float(means[pool.index(default)])
+            order = np.argsort(-means, kind="stable")
+            pool = [pool[i] for i in order]
+            round_seconds = time.perf_counter() - round_start
+            rounds.append(
+                {
+                    "rows": rows,
+                    "candidates": len(order),
+                    "best_score": float(means[order[0]]),
+                    "default_score": default_score,
+                    "seconds": round_seconds,
+                }
+            )
+            logger.info(
+                f"Tuning {name}: {len(order)} candidates on {rows} rows, "
+                f"best R2 {means[order[0]]:.3f}, defaults {default_score:.3f}"
+            )
+
+            best = {
+                "params": pool[0],
+                "score": float(means[order[0]]),
+                "default_score": default_score,
+                "rows": rows,
+            }
+            kept = pool[: max(1, math.ceil(len(pool) / factor))]
+            next_pool = kept if default in kept else kept + [default]
+            next_rows = min(rows * factor, max_rows)
+            next_seconds = (
+                round_seconds
+                * (next_rows / rows) ** exponent
+                * len(next_pool)
+                / len(pool)
+            )
+            elapsed = time.perf_counter() - start
+            if len(kept) == 1 or rows >= max_rows or elapsed + next_seconds > budget:
+                break
+            pool, rows = next_pool, next_rows
+    return {**best, "rounds": rounds, "seconds": time.perf_counter() - start}
+
+
+def tune(
+    name: str, features: FeatureMatrix, budget: float = TUNING_BUDGET_SECONDS
+) -> Dict[str, Any]:
+    """
+    Tunes the hyperparameters of the model and saves the result.
+
+    The saved best parameters are used by register_model in later runs. They
+    are the defaults from MODEL_PARAMS unless the best candidate scored
+    better than the defaults on the same rows.
+
+    Args:
+        name (str): Name of the model, a key of MODELS.
+        features (FeatureMatrix): Training data.
+        budget (float): Wall-clock budget in seconds.
+
+    Returns:
+        Dict[str, Any]: The saved result.
+    """
+    pool = candidates(name)
+    best = successive_halving(name, fold_cache(name, features), pool, budget)
+    if best["score"] <= best["default_score"]:
+        best = {**best, "params": pool[0], "score": best["default_score"]}
+    result = {
+        "data_hash": features.input_hash,
+        "search_hash": params_hash(TUNING_SPACES[name]),
+        "best_params": {key: best["params"][key] for key in TUNING_SPACES[name]},
+        "best_score": best["score"],
+        "default_score": best["default_score"],
+        "rows": best["rows"],
+        "rounds": best["rounds"],
+        "seconds": best["seconds"],
+    }
+    save_tuning(name, result)
+    logger.info(
+        f"Tuned {name} in {best['seconds']:.1f} s: {result['best_params']}, "
+        f"CV R2 {best['score']:.3f}"
+    )
+    return result
@@ -0,0 +1,208 @@
+import json
+import logging
+import os
+import zipfile
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger()
+
+WEATHER_STORE_DIR = os.path.join("project", "data", "weather_store")
+
+WEATHER_COLUMNS = [
+    "Station Code",
+    "Station Name",
+    "Year",
+    "Month",
+    "Day",
+    "Max Temp",
+    "T MAX Status",
+    "Min Temp",
+    "T MIN Status",
+    "Avg Temp",
+    "STD Status",
+    "Ground Temp",
+    "TMNG Status",
+    "Precip Sum",
+    "SMBD Status",
+    "Precip Type",
+    "Snow",
+    "PKSN Status",
+]  # based on k_d_format.txt
+
+
+def read_weather_archive(
+    archive: str, station: Optional[str] = None, chunk_size: int = 50_000
+) -> pd.DataFrame:
+    """
+    Read the daily climate rows straight from an IMGW archive.
+
+    The `k_d_*.csv` members are parsed in chunks directly from the zip file and
+    only the needed columns are kept. When a station is given, rows of other
+    stations are dropped while parsing.
+
+    Args:
+        archive (str): Path to the zip archive.
+        station (Optional[str]): Name of the station, or None to keep all stations.
+        chunk_size (int): Number of rows parsed at once.
+
+    Returns:
+        pd.DataFrame: Rows with Station Code, Station Name, Year, Month, Day, Avg Temp, Precip Sum and Precip Type.
+    """
+    columns = [
+        "Station Code",
+        "Station Name",
+        "Year",
+        "Month",
+        "Day",
+        "Avg Temp",
+        "Precip Sum",
+        "Precip Type",
+    ]
+    rows = []
+    with zipfile.ZipFile(archive) as zip_file:
+        for member in zip_file.namelist():
+            if "k_d_t" in member or "k_d_" not in member or not member.endswith(".csv"):
+                continue
+            with zip_file.open(member) as file:
+                for chunk in pd.read_csv(
+                    file,
+                    encoding="cp1250",
+                    sep=",",
+                    header=None,
+                    names=WEATHER_COLUMNS,
+                    usecols=columns,
+                    dtype={"Station Code": str, "Precip Type": str},
+                    chunksize=chunk_size,
+                ):
+                    if station is not None:
+                        chunk = chunk[chunk["Station Name"] == station]
+                    rows.append(chunk)
+    if not rows:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(rows, ignore_index=True)
+
+
+class WeatherStore:
+    """
+    Weather data of all stations partitioned by station code.
+
+    Every station is stored in its own `.npz` file with one array per column, and
+    a JSON index maps station codes to names, so reading one station never
+    touches the data of the others.
+
+    Attributes:
+        directory (str): Directory with the partitions and the index.
+    """
+
+    def __init__(self, directory: str = WEATHER_STORE_DIR) -> None:
+        """
+        Initializes a WeatherStore object and loads the station index if it exists.
+
+        Args:
+            directory (str): Directory with the partitions and the index.
+        """
+        self.directory = directory
+        self._index_path = os.path.join(directory, "stations.json")
+        self.index: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(self._index_path):
+            with open(self._index_path, "r", encoding="utf-8") as file:
+                self.index = json.load(file)
+
+    def ingest(self, archives: list[str]) -> None:
+        """
+        Parses the archives once and writes one partition per station.
+
+        Rows of stations that already have a partition are merged with it, newer
+        rows replacing older ones for the same day.
+
+        Args:
+            archives (list[str]): Paths to the IMGW zip archives.
+        """
+        frames = [read_weather_archive(archive) for archive in archives]
+        if not frames:
+            return
+        data = pd.concat(frames, ignore_index=True)
+        data["Date"] = pd.to_datetime(data[["Year", "Month", "Day"]])
+        data["Precip Type"] = data["Precip Type"].fillna("-")
+
+        os.makedirs(self.directory, exist_ok=True)
+        for code, rows in data.groupby("Station Code", sort=False):
+            code = str(code).strip()
+            name = str(rows["Station Name"].iloc[0]).strip()
+            rows = rows[["Date", "Avg Temp", "Precip Sum", "Precip Type"]]
+            if code in self.index:
+                rows = pd.concat([self._read_partition(code), rows])
+            rows = (
+                rows.drop_duplicates(subset="Date", keep="last")
+                .sort_values(by="Date")
+                .reset_index(drop=True)
+            )
+            np.savez(
+                self._partition_path(code),
+                date=rows["Date"].to_numpy(dtype="datetime64[D]"),
+                avg_temp=rows["Avg Temp"].to_numpy(dtype=np.float64),
+                precip_sum=rows["Precip Sum"].to_numpy(dtype=np.float64),
+                precip_type=rows["Precip Type"].to_numpy(dtype="U1"),
+            )
+            self.index[code] = {
+                "name": name,
+                "rows": len(rows),
+                "first": str(rows["Date"].iloc[0].date()),
+                "last": str(rows["Date"].iloc[-1].date()),
+            }
+
+        with open(self._index_path, "w", encoding="utf-8") as file:
+            json.dump(self.index, file, indent=1, ensure_ascii=False, sort_keys=True)
+        logger.info("Weather store contains %s stations", len(self.index))
+
+    def station_code(self, station: str) -> Optional[str]:
+        """
+        Resolves a station name or code to the station code.
+
+        Args:
+            station (str): Name or code of the station.
+
+        Returns:
+            Optional[str]: Code of the station, or None if it is not in the store.
+        """
+        if station in self.index:
+            return station
+        for code, entry in self.index.items():
+            if entry["name"].upper() == station.upper():
+                return code
+        return None
+
+    def read(self, station: str) -> pd.DataFrame:
+        """
+        Reads the weather data of one station.
+
+        Args:
+            station (str): Name or code of the station.
+
+        Returns:
+            pd.DataFrame: Date, Avg Temp, Precip Sum and Precip Type of the station.
+
+        Raises:
+            KeyError: If the station is not in the store.
+        """
+        code = self.station_code(station)
+        if code is None:
+            raise KeyError(f"Station {station} is not in the weather store")
+        return self._read_partition(code)
+
+    def _partition_path(self, code: str) -> str:
+        return os.path.join(self.directory, f"{code}.npz")
+
+    def _read_partition(self, code: str) -> pd.DataFrame:
+        with np.load(self._partition_path(code)) as partition:
+            return pd.DataFrame(
+                {
+                    "Date": partition["date"].astype("datetime64[ns]"),
+                    "Avg Temp": partition["avg_temp"],
+                    "Precip Sum": partition["precip_sum"],
+                    "Precip Type": partition["precip_type"].astype(object),
+                }
+            )
@@ -0,0 +1,412 @@
+import json
+import logging
+import os
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import pandas as pd
+
+from project.data_processing.calendar_table import create_calendar_table
+from project.data_processing.dataframes import read_dataset
+from project.data_processing.features import (FEATURE_COLUMNS, FEATURES_DIR,
+                                              FeatureMatrix,
+                                              feature_input_hash,
+                                              load_feature_matrix,
+                                              read_manifest)
+from project.data_processing.hashing import combine_hashes, params_hash
+from project.data_processing.holidays import create_holidays_dataframe
+from project.data_processing.model_params import model_params, read_tuning
+from project.data_processing.registry import model_registry
+from project.data_processing.storage import dataset_exists, dataset_signature
+from project.setup import (END_YEAR, MODEL_PARAMS, PREDICT_RFR, PREDICT_SVR,
+                           START_YEAR, TARGETS, TEMPORAL_FEATURES,
+                           TUNING_BUDGET_SECONDS, TUNING_CANDIDATES, TUNING_CV,
+                           TUNING_SPACES, WEATHER_STATION)
+
+logger = logging.getLogger()
+
+PIPELINE_DIR = os.path.join("project", "data", "pipeline")
+
+STAGES = ["download", "parse", "features", "tune", "train", "online", "report"]
+
+# state of the online SVR, saved by OnlineSVR
+ONLINE_STATE = os.path.join("project", "data", "online", "svr.joblib")
+
+DATASETS = ["police_data", "weather_data", "holidays_data"]
+
+
+class Stage:  # pylint: disable=too-few-public-methods
+    """
+    A step of the pipeline.
+
+    Attributes:
+        name (str): Name of the stage, one of STAGES.
+        key (Callable[[], str]): Hash of the inputs and parameters of the stage.
+        run (Callable[[], str]): Runs the stage and returns the hash of its output.
+        current (Callable[[], bool]): Checks whether the output of the stage exists.
+        cached (bool): False for stages that run every time.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        key: Callable[[], str],
+        run: Callable[[], str],
+        current: Callable[[], bool] = lambda: True,
+        cached: bool = True,
+    ) -> None:
+        self.name = name
+        self.key = key
+        self.run = run
+        self.current = current
+        self.cached = cached
+
+
+def log_results(results: Dict[str, Dict[str, Dict[str, Any]]]) -> None:
+    """
+    Logs MAE, score and prediction of every model and target.
+
+    Args:
+        results (Dict[str, Dict[str, Dict[str, Any]]]): Results by model name
+            and target.
+    """
+    for model, targets in results.items():
+        for target, result in targets.items():
+            logger.info(f"{model} prediction for {target}")
+            logger.info(f"MAE: {result['mae']}")
+            logger.info(f"{model} score: {result['score']}")
+            logger.info(
+                f"{model} prediction for {result['input']}:{result['prediction']}"
+            )
+
+
+class Pipeline:
+    """
+    Runs the project as stages:
+    download -> parse -> features -> tune -> train -> online -> report.
+
+    Every stage records the hash of its inputs and parameters and the hash of
+    its output in the state file. A stage whose key did not change and whose
+    output still exists is skipped, so a rerun without changes only checks
+    file signatures and reports the stored results.
+
+    Attributes:
+        update (bool): Download police data published since the last run and
+            the weather of its days. Tune and train are not run, the models
+            trained before are kept (see run).
+        statistics (bool): Show statistics in the report.
+        visualization (bool): Show visualizations in the report.
+        retrain_online (bool): Fit the online SVR again on the full history.
+        directory (str): Directory with the state and the training results.
+    """
+
+    def __init__(
+        self,
+        update: bool = False,
+        statistics: bool = False,
+        visualization: bool = False,
+        retrain_online: bool = False,
+        directory: str = PIPELINE_DIR,
+    ) -> None:
+        self.update = update
+        self.statistics = statistics
+        self.visualization = visualization
+        self.retrain_online = retrain_online
+        self.directory = directory
+        self.state: Dict[str, Dict[str, str]] = self._read_state()
+        self._datasets: Optional[Dict[str, pd.DataFrame]] = None
+        self.stages = [
+            Stage(
+                "download",
+                self._download_key,
+                self._download,
+                lambda: all(dataset_exists(name) for name in DATASETS),
+            ),
+            Stage("parse", self._parse_key, self._parse),
+            Stage(
+                "features",
+                self._features_key,
+                self._features,
+                self._features_current,
+            ),
+            Stage("tune", self._tune_key, self._tune, self._tune_current),
+            Stage("train", self._train_key, self._train, self._train_current),
+            Stage(
+                "online",
+                self._online_key,
+                self._online,
+                lambda: not self.retrain_online and os.path.exists(ONLINE_STATE),
+            ),
+            Stage("report", lambda: "", self._report, cached=False),
+        ]
+
+    def _state_path(self) -> str:
+        return os.path.join(self.directory, "state.json")
+
+    def _results_path(self) -> str:
+        return os.path.join(self.directory, "results.json")
+
+    def _read_state(self) -> Dict[str, Dict[str, str]]:
+        if not os.path.exists(self._state_path()):
+            return {}
+        with open(self._state_path(), "r", encoding="utf-8") as file:
+            return json.load(file)  # type: ignore[no-any-return]
+
+    def _save_state(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self._state_path()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            json.dump(self.state, file, indent=1)
+        os.replace(tmp_path, self._state_path())
+
+    def _output(self, stage: str) -> str:
+        return self.state.get(stage, {}).get("output", "")
+
+    def run(
+        self, start: Optional[str] = None, only: Optional[Sequence[str]] = None
+    ) -> None:
+        """
+        Runs the stages, skipping the ones with unchanged inputs.
+
+        With update, tune and train are skipped once they have run, unless
+        forced: the nightly update refreshes the data and the online SVR, the
+        batch models are tuned and trained again by a run without update.
+
+        Args:
+            start (Optional[str]): Force this stage and all stages after it.
+            only (Optional[Sequence[str]]): Run and force only these stages,
+                the other stages are neither checked nor run.
+
+        Raises:
+            ValueError: If a stage name is unknown.
+        """
+        unknown = set(only or []) | ({start} if start else set())
+        unknown -= set(STAGES)
+        if unknown:
+            raise ValueError(f"Unknown stages {unknown}")
+
+        forced = set(only or [])
+        if start is not None:
+            forced |= set(STAGES[STAGES.index(start) :])
+        deferred = set()
+        if self.update:
+            forced.add("download")
+            deferred = {"tune", "train"} - forced
+
+        for stage in self.stages:
+            if only and stage.name not in only:
+                continue
+            previous = self.state.get(stage.name)
+            if stage.name in deferred and previous is not None:
+                logger.info("Skipped %s, deferred by --update", stage.name)
+                continue
+            if (
+                stage.cached
+                and stage.name not in forced
+                and previous is not None
+                and previous["key"] == stage.key()
+                and stage.current()
+            ):
+                logger.info("Skipped %s, inputs did not change", stage.name)
+                continue
+
+            logger.info("Running %s", stage.name)
+            output = stage.run()
+            # the key is taken after the run, the stage may have changed its inputs
+            self.state[stage.name] = {"key": stage.key(), "output": output}
+            self._save_state()
+
+    def _datasets_frames(self) -> Dict[str, pd.DataFrame]:
+        """Reads the datasets and the calendar once, only when a stage needs them."""
+        if self._datasets is None:
+            police = read_dataset("police_data", columns=["Data"] + TARGETS)
+            weather = read_dataset("weather_data")
+            holidays = read_dataset("holidays_data")
+            # updated police data can go past END_YEAR, the calendar follows it
+            last_year = max(END_YEAR, int(police["Data"].max().year))
+            if last_year > END_YEAR:
+                holidays = pd.concat(
+                    [holidays, create_holidays_dataframe(END_YEAR + 1, last_year)],
+                    ignore_index=True,
+                )
+            self._datasets = {
+                "police": police,
+                "weather": weather,
+                "calendar": create_calendar_table(START_YEAR, last_year, holidays),
+            }
+        return self._datasets
+
+    @staticmethod
+    def _download_settings() -> Dict[str, str]:
+        """Returns the hash of the settings every downloaded dataset depends on."""
+        years = {"start": START_YEAR, "end": END_YEAR}
+        return {
+            "police_data": params_hash(years),
+            "weather_data": params_hash(years | {"station": WEATHER_STATION}),
+            "holidays_data": params_hash(years),
+            "weekends_data": params_hash(years),
+        }
+
+    def _download_key(self) -> str:
+        return params_hash(self._download_settings())
+
+    def _downloads_path(self) -> str:
+        return os.path.join(self.directory, "downloads.json")
+
+    def _download(self) -> str:
+        # imported here, the HTTP stack is needed only when something is downloaded
+        from project.data_processing.downloaders import download_data
+
+        settings = self._download_settings()
+        recorded: Dict[str, str] = {}
+        if os.path.exists(self._downloads_path()):
+            with open(self._downloads_path(), "r", encoding="utf-8") as file:
+                recorded = json.load(file)
+        # datasets downloaded with other settings, e.g. another weather station
+        stale = [
+            name
+            for name in settings
+            if recorded.get(name, settings[name]) != settings[name]
+        ]
+        results = download_data(START_YEAR, END_YEAR, self.update, stale)
+        failed = [name for name, result in results.items() if result.status != "done"]
+        # a failed update leaves the data as it was, but the run has to fail
+        if failed and (
+            self.update
+            or not all(dataset_exists(name) for name in DATASETS)
+            or any(f"{name}_data" in stale for name in failed)
+        ):
+            raise RuntimeError(f"Download of {failed} did not finish")
+
+        recorded = {name: settings[name] for name in settings if dataset_exists(name)}
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._downloads_path(), "w", encoding="utf-8") as file:
+            json.dump(recorded, file, indent=1)
+        return self._download_key()
+
+    def _parse_key(self) -> str:
+        return params_hash(
+            {name: dataset_signature(name) for name in DATASETS}
+            | {"years": [START_YEAR, END_YEAR], "temporal": TEMPORAL_FEATURES}
+        )
+
+    def _parse(self) -> str:
+        return feature_input_hash(**self._datasets_frames())
+
+    def _features_key(self) -> str:
+        return combine_hashes(self._output("parse"), params_hash(FEATURE_COLUMNS))
+
+    def _features_current(self) -> bool:
+        manifest = read_manifest()
+        return manifest is not None and manifest["input_hash"] == self._output("parse")
+
+    def _features(self) -> str:
+        return load_feature_matrix(**self._datasets_frames()).input_hash
+
+    def _tune_key(self) -> str:
+        return combine_hashes(
+            self._output("features"),
+            params_hash(
+                {
+                    "defaults": MODEL_PARAMS,
+                    "spaces": TUNING_SPACES,
+                    "candidates": TUNING_CANDIDATES,
+                    "budget": TUNING_BUDGET_SECONDS,
+                    "cv": TUNING_CV,
+                }
+            ),
+        )
+
+    def _tune_current(self) -> bool:
+        results = [read_tuning(name) for name in MODEL_PARAMS]
+        return all(
+            result is not None and result["data_hash"] == self._output("features")
+            for result in results
+        )
+
+    def _tune(self) -> str:
+        # imported here, importing scikit-learn takes longer than a run without changes
+        from project.data_processing.tuning import tune
+
+        features = FeatureMatrix(FEATURES_DIR)
+        for name in MODEL_PARAMS:
+            tune(name, features)
+        return params_hash({name: model_params(name) for name in MODEL_PARAMS})
+
+    def _train_key(self) -> str:
+        return combine_hashes(
+            self._output("features"),
+            params_hash(
+                {
+                    "models": {name: model_params(name) for name in MODEL_PARAMS},
+                    "predict_svr": PREDICT_SVR,
+                    "predict_rfr": PREDICT_RFR,
+                }
+            ),
+        )
+
+    def _train_current(self) -> bool:
+        if not os.path.exists(self._results_path()):
+            return False
+        for name in MODEL_PARAMS:
+            version = model_registry.find(
+                name, self._output("features"), model_params(name)
+            )
+            # a saved model is not enough, e.g. after toggling SVR_ENGINE back
+            if version is None or model_registry.active(name) != version:
+                return False
+        return True
+
+    def _train(self) -> str:
+        # imported here, importing scikit-learn takes longer than a run without changes
+        from project.data_processing.models import (MODEL_NAMES, predict_saved,
+                                                    register_model)
+
+        features = FeatureMatrix(FEATURES_DIR)
+        results: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for name, values in (("svr", PREDICT_SVR), ("rfr", PREDICT_RFR)):
+            version = register_model(name, features, model_registry)
+            meta = model_registry.meta(name, version)
+            predicted = predict_saved(name, [values], version, model_registry)
+            results[MODEL_NAMES[name]] = {
+                target: {
+                    **meta["metrics"][target],
+                    "input": dict(zip(meta["features"], values)),
+                    "prediction": predicted[target].tolist(),
+                }
+                for target in meta["targets"]
+            }
+
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._results_path(), "w", encoding="utf-8") as file:
+            json.dump(results, file, ensure_ascii=False, indent=1)
+        return params_hash(results)
+
+    def _online_key(self) -> str:
+        return combine_hashes(
+            self._output("features"), params_hash(model_params("svr"))
+        )
+
+    def _online(self) -> str:
+        # imported here, importing scikit-learn takes longer than a run without changes
+        from project.data_processing.online import update_online
+
+        online = update_online(FeatureMatrix(FEATURES_DIR), self.retrain_online)
+        return params_hash({"last_date": str(online.last_date), "rows": online.rows})
+
+    def _report(self) -> str:
+        if os.path.exists(self._results_path()):
+            with open(self._results_path(), "r", encoding="utf-8") as file:
+                log_results(json.load(file))
+        else:
+            logger.error("No training results, run the train stage first")
+
+        if self.visualization:
+            from project.visualization.visualization import visualize_data
+
+            frames = self._datasets_frames()
+            visualize_data(frames["police"], frames["weather"])
+        if self.statistics:
+            from project.visualization.stats import print_stats
+
+            print_stats(FeatureMatrix(FEATURES_DIR))
+        return ""
@@ -0,0 +1,321 @@
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from project.data_processing.models import MODELS, align_features, predict
+from project.data_processing.registry import ModelRegistry, model_registry
+from project.setup import (SERVER_BATCH_WINDOW, SERVER_HOST,
+                           SERVER_MAX_BATCH_ROWS, SERVER_PORT)
+
+logger = logging.getLogger()
+
+# latencies kept for percentiles
+LATENCY_WINDOW = 10_000
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    500: "Internal Server Error",
+}
+
+
+class Metrics:
+    """
+    Latency and throughput counters of the server.
+
+    Attributes:
+        started (float): Start time of the server.
+        requests (int): Answered prediction requests.
+        rows (int): Predicted rows.
+        batches (int): Calls of predict.
+        errors (int): Failed requests.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.errors = 0
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, seconds: float, rows: int) -> None:
+        """Records an answered request."""
+        self.requests += 1
+        self.rows += rows
+        self._latencies.append(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns the counters with latency percentiles in milliseconds."""
+        uptime = time.perf_counter() - self.started
+        latencies = np.array(self._latencies) * 1000
+        percentiles = (
+            np.percentile(latencies, [50, 95, 99]).tolist()
+            if len(latencies)
+            else [0.0, 0.0, 0.0]
+        )
+        return {
+            "uptime_s": uptime,
+            "requests": self.requests,
+            "rows": self.rows,
+            "batches": self.batches,
+            "errors": self.errors,
+            "requests_per_s": self.requests / uptime,
+            "rows_per_batch": self.rows / self.batches if self.batches else 0.0,
+            "latency_ms": dict(zip(["p50", "p95", "p99"], percentiles)),
+        }
+
+
+class MicroBatcher:
+    """
+    Collects concurrent requests for one model and predicts them together.
+
+    The first queued request opens a window of SERVER_BATCH_WINDOW seconds;
+    all requests queued until it closes, up to SERVER_MAX_BATCH_ROWS rows,
+    are predicted with a single predict call in a worker thread, so the
+    event loop keeps accepting requests meanwhile.
+
+    Attributes:
+        name (str): Name of the model.
+        model (Any): The fitted model.
+        meta (Dict[str, Any]): Description of the model from the registry.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        model: Any,
+        meta: Dict[str, Any],
+        metrics: Metrics,
+        executor: ThreadPoolExecutor,
+        window: float = SERVER_BATCH_WINDOW,
+        max_rows: int = SERVER_MAX_BATCH_ROWS,
+    ) -> None:
+        self.name = name
+        self.model = model
+        self.meta = meta
+        self.metrics = metrics
+        self.executor = executor
+        self.window = window
+        self.max_rows = max_rows
+        self.queue: asyncio.Queue[Tuple[pd.DataFrame, asyncio.Future[Any]]] = (
+            asyncio.Queue()
+        )
+
+    async def predict(self, rows: pd.DataFrame) -> pd.DataFrame:
+        """Queues aligned rows and waits for their predictions."""
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        await self.queue.put((rows, future))
+        return await future
+
+    async def _collect(self) -> list[Tuple[pd.DataFrame, asyncio.Future[Any]]]:
+        """Waits for a request and returns it with the requests of its window."""
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        count = len(batch[0][0])
+        deadline = loop.time() + self.window
+        while count < self.max_rows:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            count += len(item[0])
+        return batch
+
+    async def run(self) -> None:
+        """
+        Predicts queued requests in batches until cancelled.
+
+        Requests cancelled while their batch is predicted, e.g. when the
+        client disconnected, are skipped, the other requests are answered.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            rows = pd.concat([item[0] for item in batch], ignore_index=True)
+            try:
+                predicted = await loop.run_in_executor(
+                    self.executor, predict, self.model, rows, self.meta["targets"]
+                )
+            except Exception as error:  # pylint: disable=broad-except
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            self.metrics.batches += 1
+
+            start = 0
+            for item_rows, future in batch:
+                if not future.done():
+                    future.set_result(predicted.iloc[start : start + len(item_rows)])
+                start += len(item_rows)
+
+
+class PredictionServer:
+    """
+    HTTP server answering predictions of the saved models on localhost.
+
+    Endpoints:
+        POST /predict/<model>: body {"rows": [{feature: value, ...}, ...]},
+            answers {"model", "version", "predictions": [{target: value}, ...]}
+        GET /metrics: latency and throughput counters
+        GET /health: "ok"
+
+    Models are loaded once when the server starts.
+
+    Attributes:
+        host (str): Bound address.
+        port (int): Bound port.
+        metrics (Metrics): Counters of the server.
+    """
+
+    def __init__(
+        self,
+        host: str = SERVER_HOST,
+        port: int = SERVER_PORT,
+        registry: ModelRegistry = model_registry,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self.metrics = Metrics()
+        self.batchers: Dict[str, MicroBatcher] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="predict")
+
+    def _load_models(self) -> None:
+        for name in MODELS:
+            try:
+                model, meta = self.registry.load(name)
+            except FileNotFoundError:
+                logger.error("No saved model %s, run the pipeline first", name)
+                continue
+            self.batchers[name] = MicroBatcher(
+                name, model, meta, self.metrics, self._executor
+            )
+            logger.info("Loaded model %s version %s", name, meta["version"])
+        if not self.batchers:
+            raise FileNotFoundError("No saved models to serve")
+
+    async def _predict(self, name: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        batcher = self.batchers.get(name)
+        if batcher is None:
+            return 404, {"error": f"Unknown model {name}"}
+        try:
+            rows = json.loads(body)["rows"]
+            features = align_features(pd.DataFrame(rows), batcher.meta["features"])
+        except (KeyError, TypeError, ValueError) as error:
+            return 400, {"error": str(error)}
+
+        predicted = await batcher.predict(features.reset_index(drop=True))
+        return 200, {
+            "model": name,
+            "version": batcher.meta["version"],
+            "predictions": predicted.to_dict(orient="records"),
+        }
+
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        if method == "GET" and path == "/health":
+            return 200, "ok"
+        if method == "GET" and path == "/metrics":
+            return 200, self.metrics.snapshot()
+        if method == "POST" and path.startswith("/predict/"):
+            return await self._predict(path[len("/predict/") :], body)
+        return 404, {"error": f"No route {method} {path}"}
+
+    @staticmethod
+    async def _read_request(
+        reader: asyncio.StreamReader,
+    ) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        """Reads method, path, headers and body, None when the connection closed."""
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        method, path, _ = request_line.decode("latin-1").split(" ", 2)
+        headers = {}
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        body = await reader.readexactly(int(headers.get("content-length", 0)))
+        return method, path, headers, body
+
+    async def _answer(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        """Routes the request and updates the metrics."""
+        start = time.perf_counter()
+        try:
+            status, payload = await self._route(method, path, body)
+        except Exception as error:  # pylint: disable=broad-except
+            logger.error("Request %s %s failed: %s", method, path, error)
+            status, payload = 500, {"error": str(error)}
+        if status != 200:
+            self.metrics.errors += 1
+        elif path.startswith("/predict/"):
+            self.metrics.record(
+                time.perf_counter() - start, len(payload["predictions"])
+            )
+        return status, payload
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while (request := await self._read_request(reader)) is not None:
+                method, path, headers, body = request
+                status, payload = await self._answer(method, path, body)
+                content = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    "Content-Type: application/json\r\n"
+                    f"Content-Length: {len(content)}\r\n\r\n".encode("latin-1")
+                    + content
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, ready: Optional[asyncio.Event] = None) -> None:
+        """
+        Loads the models and serves requests until cancelled.
+
+        Args:
+            ready (Optional[asyncio.Event]): Set when the server accepts connections.
+        """
+        self._load_models()
+        tasks = [
+            asyncio.create_task(batcher.run()) for batcher in self.batchers.values()
+        ]
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        logger.info("Serving predictions on http://%s:%s", self.host, self.port)
+        if ready is not None:
+            ready.set()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+            self._executor.shutdown(wait=False)
+
+
+def run_server(host: str = SERVER_HOST, port: int = SERVER_PORT) -> None:
+    """Runs the prediction server until interrupted."""
+    try:
+        asyncio.run(PredictionServer(host, port).serve())
+    except KeyboardInterrupt:
+        logger.info("Server stopped")
@@ -1,4 +1,142 @@
+from typing import Any, Dict
+
 # avg temp, precip sum, weekend, holiday, last 3 days accidents
 PREDICT_SVR = [15, 4.1, 1, 0, 320]
-# month, weekday, avg temp, precip sum, weekend, holiday, last 3 days accidents
-PREDICT_RFR = [6, 0, 15, 4.1, 0, 1, 0, 320]
+# month, weekday, avg temp, S and W precip sums, weekend, holiday, last 3 days accidents,
+# accidents 1 and 7 days ago, mean of the last 7 days and EWM with a span of 28 days
+PREDICT_RFR = [6, 0, 15, 4.1, 0, 1, 0, 320, 110, 100, 105, 100]
+
+# years of downloaded data
+START_YEAR = 2018
+END_YEAR = 2023
+
+# hyperparameters of the models
+SVR_PARAMS = {"kernel": "rbf", "C": 4, "gamma": 0.1, "epsilon": 0.1}
+RFR_PARAMS = {
+    "max_depth": 7,
+    "n_estimators": 100,
+    "min_samples_leaf": 1,
+    "max_features": 1.0,
+}
+
+# SVR engine: "exact" kernel SVR, or an explicit RBF feature map with a linear SVR,
+# "nystroem" (Nystroem) or "rff" (random Fourier features) with SVR_COMPONENTS features
+SVR_ENGINE = "exact"
+SVR_COMPONENTS = 300
+
+# hyperparameters of the saved models, part of their key in the registry
+MODEL_PARAMS: Dict[str, Dict[str, Any]] = {
+    "svr": {**SVR_PARAMS, "engine": SVR_ENGINE, "n_components": SVR_COMPONENTS},
+    "rfr": RFR_PARAMS,
+}
+
+# hyperparameter tuning: searched values, number of random candidates, seconds per model,
+# cross-validation folds, training rows of the first round and reduction between rounds;
+# n_estimators is not searched, more trees only cost time
+TUNING_SPACES: Dict[str, Dict[str, list[Any]]] = {
+    "svr": {
+        "C": [0.5, 1, 2, 4, 8, 16],
+        "gamma": [0.01, 0.03, 0.1, 0.3, 1],
+        "epsilon": [0.05, 0.1, 0.5, 1],
+    },
+    "rfr": {
+        "max_depth": [3, 5, 7, 9, 12],
+        "min_samples_leaf": [1, 2, 5, 10],
+        "max_features": [0.3, 0.5, 0.7, 1.0],
+    },
+}
+TUNING_CANDIDATES = 27
+TUNING_BUDGET_SECONDS = 30
+TUNING_CV = 5
+TUNING_MIN_ROWS = 150
+TUNING_FACTOR = 3
+
+# walk-forward backtest: days of the first training window, days predicted by every
+# window, trees replaced in the forest per window and the last days they are fitted on,
+# passes of the SVR over the new rows per window and its SGD step size
+BACKTEST_INITIAL_DAYS = 730
+BACKTEST_STEP_DAYS = 91
+BACKTEST_TREES_PER_STEP = 20
+BACKTEST_RECENT_DAYS = 365
+BACKTEST_EPOCHS = 10
+BACKTEST_LEARNING_RATE = 0.02
+
+# online SVR: passes over every absorbed day after the full retraining
+ONLINE_EPOCHS = 1
+
+# predicted police data and features used by the models, in the order of PREDICT_*
+TARGETS = ["Wypadki drogowe", "Zabici w wypadkach", "Ranni w wypadkach"]
+SVR_FEATURES = ["Avg Temp", "Precip Sum", "Weekends", "Holidays", "last_3_days"]
+RFR_FEATURES = [
+    "Month",
+    "Week",
+    "Avg Temp",
+    "S",
+    "W",
+    "Weekends",
+    "Holidays",
+    "last_3_days",
+    "Wypadki drogowe lag 1",
+    "Wypadki drogowe lag 7",
+    "Wypadki drogowe mean 7",
+    "Wypadki drogowe ewm 28",
+]
+
+# temporal features computed from previous days: name -> police column, kind and days;
+# kinds: "lag" (value days ago), "sum", "mean", "std" (rolling windows of the last
+# days) and "ewm" (exponentially weighted mean with a span of days)
+TEMPORAL_FEATURES = {
+    "last_3_days": ("Wypadki drogowe", "sum", 3),
+    **{
+        f"{target} lag {days}": (target, "lag", days)
+        for target in TARGETS
+        for days in (1, 7)
+    },
+    **{
+        f"{target} mean {days}": (target, "mean", days)
+        for target in TARGETS
+        for days in (7, 28)
+    },
+    **{
+        f"{target} std {days}": (target, "std", days)
+        for target in TARGETS
+        for days in (7, 28)
+    },
+    **{
+        f"{target} ewm {days}": (target, "ewm", days)
+        for target in TARGETS
+        for days in (7, 28)
+    },
+}
+
+# policja.pl scraping: allowed requests per second, burst size and pages in flight;
+# a listing page takes about a second to answer, so the rate needs as many pages in
+# flight to be reached (at most HTTP_MAX_PER_HOST)
+POLICE_REQUESTS_PER_SECOND = 8.0
+POLICE_BURST = 8
+POLICE_MAX_IN_FLIGHT = 8
+
+# maximum size of downloaded responses kept in project/data/cache/http
+HTTP_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# shared HTTP transport: retries of transient errors and concurrent requests per host
+HTTP_RETRIES = 4
+HTTP_BACKOFF_FACTOR = 0.5
+HTTP_BACKOFF_JITTER = 0.5
+HTTP_MAX_PER_HOST = 8
+
+# IMGW archives: archives downloaded at the same time and size of streamed chunks
+WEATHER_MAX_IN_FLIGHT = 6
+WEATHER_CHUNK_SIZE = 256 * 1024
+
+# IMGW station used as the weather source
+WEATHER_STATION = "PSZCZYNA"
+
+# storage of datasets in project/data: "auto", "parquet", "npy" or "csv"
+STORAGE_BACKEND = "auto"
+
+# prediction server: address, time requests wait to be predicted together and rows per batch
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+SERVER_BATCH_WINDOW = 0.005
+SERVER_MAX_BATCH_ROWS = 1024
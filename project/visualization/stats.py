@@ -1,70 +1,54 @@
-from math import floor
-from typing import Dict, List
+from typing import Dict
 
 import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
 from scipy.stats import linregress
 
+from project.data_processing.features import FeatureMatrix
 
-def print_stats(
-    police_data: pd.DataFrame,
-    weather_data: pd.DataFrame,
-    holidays_data: pd.DataFrame,
-    weekends_data: pd.DataFrame,
-) -> None:
+
+def print_stats(features: FeatureMatrix) -> None:
     """
     Prints various statistics based on the provided data.
 
     Args:
-        police_data (pd.DataFrame): DataFrame containing police data.
-        weather_data (pd.DataFrame): DataFrame containing weather data.
-        holidays_data (pd.DataFrame): DataFrame containing holidays data.
-        weekends_data (pd.DataFrame): DataFrame containing weekends data.
+        features (FeatureMatrix): Date-aligned police, weather and calendar features.
 
     Returns:
         None
     """
 
-    temperature_accidents_regress(police_data, weather_data)
-    temperature_accidents(police_data, weather_data)
-    normal_vs_rest(police_data, holidays_data, weekends_data)
-    normal_vs_rain(police_data, weather_data)
-    normal_vs_rain_vs_snow(police_data, weather_data)
-
-
-def normal_vs_rest(
-    police_data: pd.DataFrame, holidays_data: pd.DataFrame, weekends_data: pd.DataFrame
-) -> None:
-    """Compares the number of accidents on normal days, holidays and weekends."""
-    try:
-        date = police_data["Data"].tolist()
-        accidents = police_data["Wypadki drogowe"].tolist()
-
-        holidays = holidays_data["Date"].tolist()
-        weekends = weekends_data["Date"].tolist()
-    except TypeError:
-        return
-    accidents_holiday: List[int] = []
-    accidents_weekend: List[int] = []
-
-    for i in range(len(date)):
-        if len(date) - i - 1 >= 0:
-            if date[len(date) - i - 1] in holidays:
-                date.pop(len(date) - i - 1)
-                accident = accidents.pop(len(accidents) - i - 1)
-                accidents_holiday.insert(0, accident)
-                if len(date) - i - 1 >= 0 and date[len(date) - i - 1] in weekends:
-                    accidents_weekend.insert(0, accident)
-                date.pop(len(date) - i - 1)
-
-            if len(date) - i - 1 >= 0 and date[len(date) - i - 1] in weekends:
-                date.pop(len(date) - i - 1)
-                accident = accidents.pop(len(accidents) - i - 1)
-                accidents_weekend.insert(0, accident)
-                if len(date) - i - 1 >= 0 and date[len(date) - i - 1] in holidays:
-                    accidents_holiday.insert(0, accident)
-                date.pop(len(date) - i - 1)
+    temperature_accidents_regress(features)
+    temperature_accidents(features)
+    normal_vs_rest(features)
+    normal_vs_rain(features)
+    normal_vs_rain_vs_snow(features)
+
+
+def accidents_by_temperature(features: FeatureMatrix) -> Dict[int, np.ndarray]:
+    """Groups the number of accidents by the whole degrees of average temperature."""
+    temperature = np.floor(features.column("Avg Temp")).astype(int)
+    accidents = features.column("Wypadki drogowe")
+    return {
+        degrees: accidents[temperature == degrees]
+        for degrees in np.unique(temperature).tolist()
+    }
+
+
+def normal_vs_rest(features: FeatureMatrix) -> None:
+    """
+    Compares the number of accidents on normal days, holidays and weekends.
+
+    Weekends are Fridays, Saturdays and Sundays and a holiday on a weekend is
+    in both groups. Normal days are all other days, bridge days included.
+    """
+    accidents_all = features.column("Wypadki drogowe")
+    holiday = features.column("Holidays").astype(bool)
+    weekend = features.column("Weekends").astype(bool)
+
+    accidents = accidents_all[~holiday & ~weekend]
+    accidents_holiday = accidents_all[holiday]
+    accidents_weekend = accidents_all[weekend]
 
     types = ["Normal days", "Holidays", "Weekends"]
 
@@ -91,20 +75,13 @@ def normal_vs_rest(
     plt.show()
 
 
-def normal_vs_rain(police_data: pd.DataFrame, weather_data: pd.DataFrame) -> None:
+def normal_vs_rain(features: FeatureMatrix) -> None:
     """Compares the number of accidents on normal days and rainy."""
-    try:
-        date = police_data["Data"].tolist()
-        accidents = police_data["Wypadki drogowe"].tolist()
+    accidents_all = features.column("Wypadki drogowe")
+    rain = features.column("Precip Sum") > 0
 
-        rain = weather_data["Precip Sum"].tolist()
-    except TypeError:
-        return
-
-    accidents_rain = []
-    for i in range(len(date)):
-        if rain[len(date) - i - 1] > 0:
-            accidents_rain.append(accidents.pop(len(date) - i - 1))
+    accidents = accidents_all[~rain]
+    accidents_rain = accidents_all[rain]
 
     types = ["Normal days", "Rainy days"]
     fig, ax = plt.subplots()
@@ -129,27 +106,15 @@ def normal_vs_rain(police_data: pd.DataFrame, weather_data: pd.DataFrame) -> Non
     plt.show()
 
 
-def normal_vs_rain_vs_snow(
-    police_data: pd.DataFrame, weather_data: pd.DataFrame
-) -> None:
+def normal_vs_rain_vs_snow(features: FeatureMatrix) -> None:
     """Compares the number of accidents on normal days, rainy and snowy."""
-    try:
-        date = police_data["Data"].tolist()
-        accidents = police_data["Wypadki drogowe"].tolist()
-
-        precip = weather_data["Precip Sum"].tolist()
-        precip_type = weather_data["Precip Type"].tolist()
-    except TypeError:
-        return
-
-    accidents_rain = []
-    accidents_snow = []
-    for i in range(len(date)):
-        if precip[len(date) - i - 1] > 0:
-            if precip_type[len(date) - i - 1] == "S":
-                accidents_snow.append(accidents.pop(len(date) - i - 1))
-            else:
-                accidents_rain.append(accidents.pop(len(date) - i - 1))
+    accidents_all = features.column("Wypadki drogowe")
+    precip = features.column("Precip Sum") > 0
+    snow = features.column("S") > 0
+
+    accidents = accidents_all[~precip]
+    accidents_rain = accidents_all[precip & ~snow]
+    accidents_snow = accidents_all[precip & snow]
 
     types = ["Normal days", "Rainy days", "Snowy days"]
     fig, ax = plt.subplots()
@@ -174,26 +139,9 @@ def normal_vs_rain_vs_snow(
     plt.show()
 
 
-def temperature_accidents(
-    police_data: pd.DataFrame, weather_data: pd.DataFrame
-) -> None:
+def temperature_accidents(features: FeatureMatrix) -> None:
     """Compares the number of accidents on different temperatures."""
-    try:
-        date = police_data["Data"].tolist()
-        accidents = police_data["Wypadki drogowe"].tolist()
-
-        temperature = weather_data["Std Temp"].tolist()
-    except TypeError:
-        return
-
-    accidents_temperature: Dict[int, List[int]] = {}
-    for i in range(len(date)):
-        if floor(temperature[len(date) - i - 1]) not in accidents_temperature.keys():
-            accidents_temperature[floor(temperature[len(date) - i - 1])] = []
-
-        accidents_temperature[floor(temperature[len(date) - i - 1])].append(
-            accidents.pop(len(date) - i - 1)
-        )
+    accidents_temperature = accidents_by_temperature(features)
 
     fig, ax = plt.subplots()
     ax.bar(
@@ -218,26 +166,9 @@ def temperature_accidents(
     plt.show()
 
 
-def temperature_accidents_regress(
-    police_data: pd.DataFrame, weather_data: pd.DataFrame
-) -> None:
+def temperature_accidents_regress(features: FeatureMatrix) -> None:
     """Compares the number of accidents on different temperatures with regression line."""
-    try:
-        date = police_data["Data"].tolist()
-        accidents = police_data["Wypadki drogowe"].tolist()
-
-        temperature = weather_data["Std Temp"].tolist()
-    except TypeError:
-        return
-
-    accidents_temperature: Dict[int, List[int]] = {}
-    for i in range(len(date)):
-        if floor(temperature[len(date) - i - 1]) not in accidents_temperature.keys():
-            accidents_temperature[floor(temperature[len(date) - i - 1])] = []
-
-        accidents_temperature[floor(temperature[len(date) - i - 1])].append(
-            accidents.pop(len(date) - i - 1)
-        )
+    accidents_temperature = accidents_by_temperature(features)
 
     fig, ax = plt.subplots()
 
@@ -0,0 +1,54 @@
+import asyncio
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from project.server import Metrics, MicroBatcher
+
+
+class BlockingModel:
+    """Model whose predict waits until it is released."""
+
+    def __init__(self) -> None:
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def predict(self, rows: pd.DataFrame) -> np.ndarray:
+        self.started.set()
+        self.release.wait(5)
+        values: np.ndarray = rows.to_numpy()
+        return values
+
+
+class MicroBatcherTest(unittest.IsolatedAsyncioTestCase):
+    async def test_cancelled_request_does_not_stop_the_batcher(self) -> None:
+        model = BlockingModel()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            batcher = MicroBatcher(
+                "test", model, {"targets": ["y"]}, Metrics(), executor, window=0.05
+            )
+            runner = asyncio.create_task(batcher.run())
+            cancelled = asyncio.create_task(batcher.predict(pd.DataFrame({"x": [1.0]})))
+            kept = asyncio.create_task(batcher.predict(pd.DataFrame({"x": [2.0]})))
+
+            # cancel one waiter while the batch is predicted
+            await asyncio.to_thread(model.started.wait, 5)
+            cancelled.cancel()
+            model.release.set()
+
+            self.assertEqual((await asyncio.wait_for(kept, 5))["y"].tolist(), [2.0])
+            with self.assertRaises(asyncio.CancelledError):
+                await cancelled
+            later = await asyncio.wait_for(
+                batcher.predict(pd.DataFrame({"x": [3.0]})), 5
+            )
+            self.assertEqual(later["y"].tolist(), [3.0])
+            self.assertFalse(runner.done())
+            runner.cancel()
+
+
+if __name__ == "__main__":
+    unittest.main()